@@ -0,0 +1,82 @@
+"""Decode + apply cost per message for each installed frame decoder.
+
+Every frame is passed to `NCAALiveStats.receive` as raw bytes, as
+`FeedClient` does, so the timings include decoding and handling.
+
+Scenarios:
+    recorded   -- a captured feed (JSONL), `test_output` by default
+    live       -- synthetic game, a box score after every action
+    playbyplay -- teams plus the full-game `playbyplayOnConnect` burst
+
+Usage:
+    python benchmarks/bench_decode.py [--recording PATH] [--rounds N] [--actions N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import synthetic
+from bench_receive import DEFAULT_RECORDING, percentile
+from ncaa_live_stats import NCAALiveStats
+from ncaa_live_stats.decoding import available_decoders
+
+
+def run(frames: list, decoder: str, rounds: int) -> dict:
+    latencies = defaultdict(list)
+    for _ in range(rounds):
+        stats = NCAALiveStats(output=None, decoder=decoder)
+        for frame in frames:
+            start = time.perf_counter()
+            kind = stats.receive(frame)
+            latencies[kind].append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", default=DEFAULT_RECORDING)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--actions", type=int, default=400)
+    args = parser.parse_args()
+    logger.remove()
+
+    scenarios = {
+        "live": synthetic.live_game(args.actions),
+        "playbyplay": synthetic.playbyplay_burst(args.actions),
+    }
+    frames = {
+        name: [json.dumps(m).encode("utf-8") + b"\r\n" for m in messages]
+        for name, messages in scenarios.items()
+    }
+    if os.path.exists(args.recording):
+        with open(args.recording, "rb") as f:
+            frames["recorded"] = [line.rstrip(b"\r\n") + b"\r\n" for line in f if line.strip()]
+
+    decoders = available_decoders()
+    for name, scenario_frames in frames.items():
+        print(f"{name} ({len(scenario_frames)} frames), mean us per message:")
+        results = {decoder: run(scenario_frames, decoder, args.rounds) for decoder in decoders}
+        kinds = sorted({kind for latencies in results.values() for kind in latencies}, key=str)
+        print(f"  {'type':<18}" + "".join(f"{decoder:>12}" for decoder in decoders))
+        for kind in kinds:
+            row = ""
+            for decoder in decoders:
+                values = results[decoder].get(kind, [])
+                row += f"{sum(values) / len(values) * 1e6:12.1f}" if values else f"{'-':>12}"
+            print(f"  {str(kind):<18}{row}")
+        p99 = "".join(
+            f"{percentile([v for vs in results[d].values() for v in vs], 99) * 1e6:12.1f}"
+            for d in decoders
+        )
+        print(f"  {'p99 (all)':<18}{p99}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Memory held per action and per game.
+
+Compares the slotted structs (with interned strings) against equivalent
+plain dataclasses, built from the same feed messages.
+
+Usage:
+    python benchmarks/bench_memory.py [--recording PATH] [--actions N]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from dataclasses import MISSING, fields, is_dataclass, make_dataclass
+from dataclasses import field as dc_field
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import synthetic
+from ncaa_live_stats import NCAALiveStats, schema, structs
+from ncaa_live_stats.supervisor import deep_sizeof
+
+
+def legacy_class(cls: type) -> type:
+    """A plain (unslotted) dataclass with the same fields as `cls`."""
+    spec = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            spec.append((f.name, f.type, dc_field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            spec.append((f.name, f.type, dc_field(default_factory=f.default_factory)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(f"Legacy{cls.__name__}", spec)
+
+
+LEGACY = {
+    cls: legacy_class(cls)
+    for cls in (structs.Action, structs.Player, structs.PlayerStats, structs.TeamStats)
+}
+LEGACY_ACTION_FIELDS = [
+    schema.Field(f.name, f.path, str if f.cast in (sys.intern, schema.intern_all) else f.cast, f.default_factory)
+    for f in schema.ACTION
+]
+decode_legacy_action = schema.compile_decoder(LEGACY[structs.Action], LEGACY_ACTION_FIELDS)
+
+
+def uninterned(value):
+    # Decoding bytes yields a fresh string object, as json.loads would.
+    return value.encode().decode() if isinstance(value, str) else value
+
+
+def to_legacy(obj):
+    """Rebuild a game's slotted objects as plain dataclasses with private strings."""
+    if isinstance(obj, list):
+        return [to_legacy(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: to_legacy(v) for k, v in obj.items()}
+    if is_dataclass(obj) and not isinstance(obj, type):
+        cls = LEGACY.get(type(obj))
+        values = {f.name: to_legacy(getattr(obj, f.name)) for f in fields(obj)}
+        if cls is None:
+            rebuilt = type(obj).__new__(type(obj))
+            for name, value in values.items():
+                object.__setattr__(rebuilt, name, value)
+            return rebuilt
+        return cls(**values)
+    return uninterned(obj)
+
+
+def retained_bytes(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", default=None, help="JSONL recording to load")
+    parser.add_argument("--actions", type=int, default=500)
+    args = parser.parse_args()
+    logger.remove()
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            messages = [json.loads(line) for line in f if line.strip()]
+    else:
+        messages = synthetic.live_game(args.actions)
+    action_lines = [json.dumps(m).encode() for m in messages if m.get("type") == "action"]
+
+    results = {}
+    for name, decode in (("plain", decode_legacy_action), ("slotted", schema.decode_action)):
+        actions, size = retained_bytes(lambda: [decode(json.loads(line)) for line in action_lines])
+        results[name] = size / len(actions)
+        print(f"{name:>8}: {results[name]:8.0f} bytes per action")
+    print(f"   saving: {1 - results['slotted'] / results['plain']:.0%}")
+
+    stats = NCAALiveStats(output=None)
+    for message in messages:
+        stats.receive(message)
+    game = stats.game
+    slotted = deep_sizeof(game)
+    plain = deep_sizeof(to_legacy(game))
+    print(f"game with {len(game.actions)} actions:")
+    print(f"    plain: {plain / 1024:8.1f} KiB")
+    print(f"  slotted: {slotted / 1024:8.1f} KiB ({1 - slotted / plain:.0%} smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Cost of `Metrics` instrumentation on `NCAALiveStats.receive`.
+
+Runs the same frames through a parser without metrics, with metrics,
+and with metrics plus the sampling profiler. The configurations are
+interleaved within each repeat, so drift on the machine hits them all
+alike. Each configuration's cost is the median over repeats of its
+difference from the uninstrumented run of the same repeat, reported with
+its interquartile range.
+
+Two streams are run: the whole game, and only its pings and actions,
+where the fixed per-message cost of instrumentation is easier to see.
+Then prints the profiler's hottest stacks.
+
+Usage:
+    python benchmarks/bench_metrics.py [--recording PATH] [--repeats N] [--actions N]
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import synthetic
+from ncaa_live_stats import Metrics, NCAALiveStats
+
+CONFIGS = {
+    "no metrics": {},
+    "metrics": {"metrics": True},
+    "metrics + profiler": {"metrics": True, "profile": True},
+}
+
+
+def run(frames: list, metrics: bool = False, profile: bool = False) -> float:
+    collected = Metrics() if metrics else None
+    stats = NCAALiveStats(output=None, metrics=collected)
+    stats.add_listener("action", lambda game: None)
+    stats.add_change_listener(lambda changes, game: None, ("teams",))
+    if profile:
+        collected.start_profiler()
+    gc.collect()
+    start = time.perf_counter()
+    for frame in frames:
+        stats.receive(frame)
+    elapsed = time.perf_counter() - start
+    if profile:
+        collected.stop_profiler()
+    return elapsed / len(frames)
+
+
+def report(label: str, frames: list, repeats: int) -> None:
+    names = list(CONFIGS)
+    results = {name: [] for name in names}
+    run(frames)  # warm-up
+    for repeat in range(repeats):
+        # Rotate the order so no configuration always runs first.
+        shift = repeat % len(names)
+        for name in names[shift:] + names[:shift]:
+            results[name].append(run(frames, **CONFIGS[name]))
+
+    baseline = results["no metrics"]
+    print(f"{label}: {len(frames)} frames, {repeats} interleaved repeats, us per message")
+    print(f"  {'no metrics':<20}{statistics.median(baseline) * 1e6:9.2f}")
+    for name in names[1:]:
+        added = sorted((t - b) * 1e6 for t, b in zip(results[name], baseline))
+        q1, median, q3 = statistics.quantiles(added, n=4)
+        print(f"  {name:<20}{median:+9.2f}  (IQR {q1:+.2f} .. {q3:+.2f})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", default=None, help="JSONL recording, a synthetic game by default")
+    parser.add_argument("--repeats", type=int, default=15)
+    parser.add_argument("--actions", type=int, default=400)
+    args = parser.parse_args()
+    logger.remove()
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            frames = [line.rstrip(b"\r\n") for line in f if line.strip()]
+    else:
+        frames = [json.dumps(m).encode() for m in synthetic.live_game(args.actions)]
+
+    light = [frame for frame in frames if b'"ping"' in frame or b'"action"' in frame]
+    for label, stream in (("whole game", frames), ("pings and actions", light)):
+        report(label, stream, args.repeats)
+
+    metrics = Metrics()
+    stats = NCAALiveStats(output=None, metrics=metrics)
+    profiler = metrics.start_profiler()
+    for frame in frames:
+        stats.receive(frame)
+    metrics.stop_profiler()
+    print("hottest sampled stacks (innermost frame):")
+    for stack, count in profiler.samples.most_common(5):
+        print(f"  {count:6d}  {stack.rsplit(';', 1)[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Throughput and per-message-type latency of `NCAALiveStats.receive`.
+
+Scenarios:
+    recorded   -- a captured feed (JSONL), `test_output` by default
+    live       -- synthetic game, a box score after every action
+    playbyplay -- teams plus the full-game `playbyplayOnConnect` burst
+
+Usage:
+    python benchmarks/bench_receive.py [--recording PATH] [--output FILE]
+                                       [--compare OLD_RESULTS]
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import synthetic
+from ncaa_live_stats import NCAALiveStats
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RECORDING = os.path.join(os.path.dirname(HERE), "test_output")
+
+
+def load_recording(path: str) -> list:
+    with open(path, "rb") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_timed(messages: list, rounds: int) -> dict:
+    latencies = defaultdict(list)
+    total_messages = 0
+    total_time = 0.0
+    for _ in range(rounds):
+        # receive() does not mutate messages, but copy anyway so every
+        # round starts from identical input.
+        batch = copy.deepcopy(messages)
+        stats = NCAALiveStats(output=None)
+        for message in batch:
+            kind = message.get("type")
+            start = time.perf_counter()
+            stats.receive(message)
+            elapsed = time.perf_counter() - start
+            latencies[kind].append(elapsed)
+            total_time += elapsed
+            total_messages += 1
+    per_type = {
+        kind: {
+            "count": len(values),
+            "mean_us": sum(values) / len(values) * 1e6,
+            "p50_us": percentile(values, 50) * 1e6,
+            "p99_us": percentile(values, 99) * 1e6,
+        }
+        for kind, values in latencies.items()
+    }
+    return {
+        "messages": total_messages,
+        "messages_per_sec": total_messages / total_time if total_time else 0.0,
+        "per_type": per_type,
+    }
+
+
+def run_allocations(messages: list) -> dict:
+    """Peak transient and retained bytes per message, by type."""
+    batch = copy.deepcopy(messages)
+    stats = NCAALiveStats(output=None)
+    totals = defaultdict(lambda: {"count": 0, "peak": 0, "retained": 0, "blocks": 0})
+    tracemalloc.start()
+    try:
+        for message in batch:
+            kind = message.get("type")
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            blocks_before = sys.getallocatedblocks()
+            stats.receive(message)
+            after, peak = tracemalloc.get_traced_memory()
+            entry = totals[kind]
+            entry["count"] += 1
+            entry["peak"] += peak - before
+            entry["retained"] += after - before
+            entry["blocks"] += sys.getallocatedblocks() - blocks_before
+    finally:
+        tracemalloc.stop()
+    return {
+        kind: {
+            "peak_bytes_per_message": t["peak"] / t["count"],
+            "retained_bytes_per_message": t["retained"] / t["count"],
+            "retained_blocks_per_message": t["blocks"] / t["count"],
+        }
+        for kind, t in totals.items()
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(results: dict, old: dict) -> None:
+    for name, scenario in results["scenarios"].items():
+        previous = old.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        before = previous["messages_per_sec"]
+        after = scenario["messages_per_sec"]
+        print(f"{name}: {before:,.0f} -> {after:,.0f} msg/s ({after / before - 1:+.1%})")
+        for kind, stats in scenario["per_type"].items():
+            old_stats = previous["per_type"].get(kind)
+            if old_stats:
+                print(
+                    f"  {kind:<18} p50 {old_stats['p50_us']:9.1f} -> {stats['p50_us']:9.1f} us"
+                    f"   p99 {old_stats['p99_us']:9.1f} -> {stats['p99_us']:9.1f} us"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", default=DEFAULT_RECORDING)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--actions", type=int, default=400)
+    parser.add_argument("--output", default=None, help="results JSON file")
+    parser.add_argument("--compare", default=None, help="previous results JSON file")
+    args = parser.parse_args()
+
+    scenarios = {"live": synthetic.live_game(args.actions)}
+    scenarios["playbyplay"] = synthetic.playbyplay_burst(args.actions)
+    if os.path.exists(args.recording):
+        scenarios["recorded"] = load_recording(args.recording)
+
+    logger.remove()
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scenarios": {},
+    }
+    for name, messages in scenarios.items():
+        scenario = run_timed(messages, args.rounds)
+        allocations = run_allocations(messages)
+        for kind, values in allocations.items():
+            scenario["per_type"][kind].update(values)
+        results["scenarios"][name] = scenario
+
+    for name, scenario in results["scenarios"].items():
+        print(f"{name}: {scenario['messages_per_sec']:,.0f} msg/s")
+        for kind, stats in scenario["per_type"].items():
+            print(
+                f"  {kind:<18} n={stats['count']:<6} p50={stats['p50_us']:9.1f}us "
+                f"p99={stats['p99_us']:9.1f}us peak={stats['peak_bytes_per_message']:9.0f}B "
+                f"retained={stats['retained_bytes_per_message']:8.0f}B"
+            )
+
+    output = args.output or os.path.join(HERE, "results", f"receive-{results['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
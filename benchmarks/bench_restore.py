@@ -0,0 +1,91 @@
+"""Time to get a completed game back after an ingest restart.
+
+Journals a whole game, then compares rebuilding it by replaying every
+logged message against `Journal.restore()` (newest checkpoint plus the
+log tail), and against receiving the play-by-play burst a fresh
+connection would get.
+
+Usage:
+    python benchmarks/bench_restore.py [--recording PATH] [--actions N] [--checkpoint-every N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import synthetic
+from ncaa_live_stats import NCAALiveStats
+from ncaa_live_stats.journal import Journal
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", default=None, help="JSONL recording to journal")
+    parser.add_argument("--actions", type=int, default=500)
+    parser.add_argument("--checkpoint-every", type=int, default=500)
+    args = parser.parse_args()
+    logger.remove()
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            frames = [line.rstrip(b"\r\n") for line in f if line.strip()]
+    else:
+        frames = [json.dumps(m).encode() for m in synthetic.live_game(args.actions)]
+    messages = [json.loads(frame) for frame in frames]
+
+    with tempfile.TemporaryDirectory() as directory:
+        live = NCAALiveStats(output=None)
+        journal = Journal(directory, live, checkpoint_every=args.checkpoint_every)
+        for frame, message in zip(frames, messages):
+            journal.record(frame, live.receive(message))
+        journal.close()
+        actions = len(live.game.actions)
+        expected = live.as_json()
+
+        def replay_log() -> None:
+            stats = NCAALiveStats(output=None)
+            with open(os.path.join(directory, "events.jsonl"), "rb") as f:
+                for line in f:
+                    stats.receive(json.loads(line))
+
+        restored = NCAALiveStats(output=None)
+
+        def restore() -> None:
+            restored_journal = Journal(directory, restored)
+            restored_journal.restore()
+            restored_journal.close()
+
+        burst = synthetic.playbyplay_burst(actions)
+
+        def playbyplay() -> None:
+            stats = NCAALiveStats(output=None)
+            for message in burst:
+                stats.receive(message)
+
+        results = {
+            "full log replay": timed(replay_log),
+            "playbyplay burst": timed(playbyplay),
+            "checkpoint restore": timed(restore),
+        }
+        matches = restored.as_json() == expected
+
+    print(f"game with {actions} actions, {len(frames)} messages")
+    for name, seconds in results.items():
+        print(f"{name:>20}: {seconds * 1e3:9.1f} ms")
+    print(f"restored game matches: {matches}")
+
+
+if __name__ == "__main__":
+    main()
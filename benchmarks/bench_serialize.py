@@ -0,0 +1,58 @@
+"""Cost of a JSON snapshot while a game is in progress.
+
+Compares `dataclasses.asdict` + `json.dumps` on the whole game against the
+cached `NCAALiveStats.as_json`, polling after every message.
+
+Usage:
+    python benchmarks/bench_serialize.py [--actions N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import synthetic
+from ncaa_live_stats import NCAALiveStats
+from ncaa_live_stats.serialize import _default
+
+
+def legacy(stats: NCAALiveStats) -> bytes:
+    return json.dumps(asdict(stats.game), default=_default).encode("utf-8")
+
+
+def cached(stats: NCAALiveStats) -> bytes:
+    return stats.as_json()
+
+
+def run(messages: list, snapshot) -> float:
+    stats = NCAALiveStats(output=None)
+    spent = 0.0
+    for message in messages:
+        stats.receive(message)
+        start = time.perf_counter()
+        snapshot(stats)
+        spent += time.perf_counter() - start
+    return spent / len(messages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--actions", type=int, default=400)
+    args = parser.parse_args()
+    logger.remove()
+
+    messages = synthetic.live_game(args.actions)
+    results = {name: run(messages, fn) for name, fn in (("asdict", legacy), ("cached", cached))}
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds * 1e3:8.3f} ms per snapshot")
+    print(f" speedup: {results['asdict'] / results['cached']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
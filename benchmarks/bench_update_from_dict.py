@@ -0,0 +1,73 @@
+"""Per-box-message cost of `FromDictMixin.update_from_dict`.
+
+Compares the original per-key translation (lstrip + inflection.underscore
++ annotation lookup on every key) against the cached field maps.
+
+Usage:
+    python benchmarks/bench_update_from_dict.py [--messages N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import inflection
+from loguru import logger
+
+import synthetic
+from ncaa_live_stats.structs import PlayerStats, TeamStats
+
+
+def legacy_update_from_dict(obj, message: dict, strip: str = "") -> None:
+    annotations = obj.__annotations__
+    for key, value in message.items():
+        normal_key = inflection.underscore(key.lstrip(strip))
+        cast_type = annotations.get(normal_key)
+        if cast_type is not None:
+            cast_value = cast_type(value)
+            if cast_value != getattr(obj, normal_key):
+                setattr(obj, normal_key, cast_value)
+        else:
+            logger.debug(f"Unknown field {normal_key} found on {obj.__class__}")
+
+
+def cached_update_from_dict(obj, message: dict, strip: str = "") -> None:
+    obj.update_from_dict(message, strip=strip)
+
+
+def apply_box(update, messages: list, players: dict, teams: dict) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        for team in message["teams"]:
+            number = team["teamNumber"]
+            for player in team["total"]["players"]:
+                update(players[number, player["pno"]], player, "s")
+            update(teams[number], team["total"]["team"], "s_")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=300)
+    args = parser.parse_args()
+
+    logger.remove()
+    messages = [synthetic.box_message(i) for i in range(args.messages)]
+    results = {}
+    for name, update in (("legacy", legacy_update_from_dict), ("cached", cached_update_from_dict)):
+        players = {
+            (team, pno): PlayerStats()
+            for team in (1, 2)
+            for pno in range(1, synthetic.PLAYERS_PER_TEAM + 1)
+        }
+        teams = {1: TeamStats(), 2: TeamStats()}
+        elapsed = apply_box(update, messages, players, teams)
+        results[name] = elapsed / len(messages)
+        print(f"{name:>7}: {results[name] * 1e6:10.1f} us per box message")
+    print(f"speedup: {results['legacy'] / results['cached']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
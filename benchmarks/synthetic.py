@@ -0,0 +1,171 @@
+"""Synthetic Live Stats feed messages for benchmarks.
+
+Messages mirror the shape of the recorded TV feed closely enough to
+exercise every `NCAALiveStats` handler. Generation is seeded so runs
+are comparable.
+"""
+import random
+from dataclasses import fields
+
+import inflection
+
+from ncaa_live_stats.structs import PlayerStats, TeamStats
+
+PLAYERS_PER_TEAM = 13
+SHOTS = [("2pt", "jumpshot"), ("2pt", "layup"), ("3pt", "jumpshot"), ("2pt", "drivinglayup")]
+AREAS = ["paint", "midrange", "corner3", "wing3", "top3"]
+OTHER_ACTIONS = [
+    ("rebound", "defensive"),
+    ("rebound", "offensive"),
+    ("foul", "personal"),
+    ("foulon", ""),
+    ("assist", ""),
+    ("turnover", "badpass"),
+    ("steal", ""),
+    ("block", ""),
+    ("substitution", "in"),
+]
+
+
+def _camel_stat_key(name: str) -> str:
+    return "s" + inflection.camelize(name)
+
+
+PLAYER_STAT_KEYS = [_camel_stat_key(f.name) for f in fields(PlayerStats) if f.name != "pno"]
+TEAM_STAT_KEYS = [_camel_stat_key(f.name) for f in fields(TeamStats)]
+
+
+def teams_message() -> dict:
+    teams = []
+    for number, name in ((1, "Home"), (2, "Away")):
+        players = [
+            {
+                "pno": pno,
+                "familyName": f"Player{pno} ",
+                "firstName": f" {name}",
+                "height": 0.0,
+                "shirtNumber": str(pno * 2),
+                "playingPosition": "G",
+                "starter": int(pno <= 5),
+                "captain": int(pno == 1),
+                "active": 1,
+            }
+            for pno in range(1, PLAYERS_PER_TEAM + 1)
+        ]
+        teams.append(
+            {
+                "teamNumber": number,
+                "detail": {
+                    "teamName": f"{name} University",
+                    "teamCode": name[:3].upper(),
+                    "teamCodeLong": name,
+                    "isHomeCompetitor": int(number == 1),
+                },
+                "players": players,
+            }
+        )
+    return {"teams": teams, "type": "teams"}
+
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 60:02d}:{seconds % 60:02d}:00"
+
+
+def action_messages(count: int, seed: int = 7) -> list:
+    """A plausible game's worth of numbered actions with running scores."""
+    rng = random.Random(seed)
+    score = {1: 0, 2: 0}
+    actions = []
+    for n in range(1, count + 1):
+        team = rng.choice((1, 2))
+        elapsed = int(n * 2400 / count)
+        period = 1 if elapsed < 1200 else 2
+        message = {
+            "actionNumber": n,
+            "teamNumber": team,
+            "pno": rng.randint(1, PLAYERS_PER_TEAM),
+            "clock": _clock(1200 - elapsed % 1200),
+            "shotClock": "30:00",
+            "timeActual": f"2022-06-07 19:{n % 60:02d}:{n * 7 % 60:02d}",
+            "period": period,
+            "periodType": "REGULAR",
+            "qualifiers": [],
+            "side": "left",
+        }
+        if rng.random() < 0.45:
+            kind, sub_type = rng.choice(SHOTS)
+            success = rng.random() < 0.45
+            if success:
+                score[team] += 3 if kind == "3pt" else 2
+            message.update(
+                actionType=kind,
+                subType=sub_type,
+                success=int(success),
+                x=round(rng.uniform(0, 100), 2),
+                y=round(rng.uniform(0, 100), 2),
+                area=rng.choice(AREAS),
+            )
+        elif rng.random() < 0.15:
+            success = rng.random() < 0.75
+            if success:
+                score[team] += 1
+            message.update(actionType="freethrow", subType="1of2", success=int(success))
+        else:
+            kind, sub_type = rng.choice(OTHER_ACTIONS)
+            message.update(actionType=kind, subType=sub_type, success=1)
+        message.update(score1=score[1], score2=score[2], messageId=n, type="action")
+        actions.append(message)
+    return actions
+
+
+def box_message(seed: int) -> dict:
+    rng = random.Random(seed)
+    teams = []
+    for number in (1, 2):
+        players = []
+        for pno in range(1, PLAYERS_PER_TEAM + 1):
+            stats = {key: rng.randint(0, 12) for key in PLAYER_STAT_KEYS}
+            stats["pno"] = pno
+            players.append(stats)
+        team = {key: rng.randint(0, 80) for key in TEAM_STAT_KEYS}
+        teams.append(
+            {"teamNumber": number, "total": {"players": players, "team": team}}
+        )
+    return {"teams": teams, "type": "boxscore"}
+
+
+def status_message(n: int) -> dict:
+    return {
+        "status": "INPROGRESS",
+        "period": {"current": 1 + n % 2, "periodType": "REGULAR"},
+        "clock": _clock(1200 - n % 1200),
+        "shotClock": "30:00",
+        "clockRunning": n % 2,
+        "possession": 1 + n % 2,
+        "possessionArrow": 1,
+        "type": "status",
+    }
+
+
+def ping_message(n: int) -> dict:
+    return {"timestamp": f"2022-06-07 19:{n // 60 % 60:02d}:{n % 60:02d}:00", "type": "ping"}
+
+
+def live_game(actions: int = 400) -> list:
+    """Teams, then each action followed by a box score, with periodic status and pings."""
+    messages = [teams_message()]
+    for i, action in enumerate(action_messages(actions)):
+        messages.append(action)
+        messages.append(box_message(i))
+        if i % 10 == 0:
+            messages.append(status_message(i))
+            messages.append(ping_message(i))
+    return messages
+
+
+def playbyplay_burst(actions: int = 500) -> list:
+    """Teams followed by the single `playbyplay` message sent on connect."""
+    return [
+        teams_message(),
+        {"actions": action_messages(actions), "type": "playbyplay"},
+    ]
@@ -1,14 +1,11 @@
 import sys
-import socket
-import json
-from boltons.socketutils import BufferedSocket
-from ncaa_live_stats import NCAALiveStats
+import asyncio
+from ncaa_live_stats import FeedClient, NCAALiveStats
 from ncaa_live_stats.compose.player import compose_player_statline
-from ncaa_live_stats.structs import ActionType, Game
+from ncaa_live_stats.structs import Game
 from loguru import logger
 
 
-sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 stats = NCAALiveStats()
 
 logger.remove()
@@ -19,9 +16,11 @@ def track_scoring_drought(game: Game):
     last_action = game.actions[-1]
     if last_action.is_scoring_play:
         team = last_action.get_team(game)
-        print(f"Team {team.name} last score time is {last_action.clock_norm}")
-        if last_action.action_type != ActionType.FREETHROW:
-            print(f"Team {team.name} last FG time is {last_action.clock_norm}")
+        for other in (game.home_team, game.away_team):
+            if other is not team:
+                drought = game.derived.scoring_drought(other.number)
+                print(f"Team {other.name} has not scored for {drought:.0f}s")
+        print(f"Team {team.name} is on a {game.derived.run_points}-0 run")
 
 def get_starters(game: Game):
     home_starters = [
@@ -37,17 +36,5 @@ def get_starters(game: Game):
 stats.add_listener("action", track_scoring_drought)
 stats.add_listener("teams", get_starters)
 
-params = {
-    "type": "parameters",
-    "types": "se,ac,mi,te,sc,pbp,box",
-    "playbyplayOnConnect": 1,
-}
-
-sock.connect(("10.250.37.65", 7677))
-sock.sendall(json.dumps(params).encode("utf-8"))
-bsock = BufferedSocket(sock, maxsize=2097152, timeout=None)
-
-while True:
-    data = bsock.recv_until(b"\r\n")
-    payload = json.loads(data)
-    stats.receive(payload)
+client = FeedClient("10.250.37.65", 7677, stats=stats)
+asyncio.run(client.run())
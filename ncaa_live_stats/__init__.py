@@ -1,2 +1,9 @@
 from .main import NCAALiveStats
 from .structs import *
+from .client import FeedClient
+from .supervisor import GameSupervisor
+from .server import LiveStatsApp
+from .journal import Journal
+from .dispatch import ListenerDispatcher
+from .metrics import Metrics
+from .watchdog import FeedWatchdog
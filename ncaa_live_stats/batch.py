@@ -0,0 +1,281 @@
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .main import NCAALiveStats
+from .structs import ActionType, Game, PeriodType, Team
+
+CACHE_VERSION = 1
+FIELD_GOALS = (ActionType.TWOPT, ActionType.THREEPT)
+POINTS = {ActionType.TWOPT: 2, ActionType.THREEPT: 3, ActionType.FREETHROW: 1}
+# Season-level ratios are recomputed from the summed counts.
+RATIOS = {
+    "field_goals_percentage": ("field_goals_made", "field_goals_attempted"),
+    "field_goal_percentage": ("field_goals_made", "field_goals_attempted"),
+    "two_pointers_percentage": ("two_pointers_made", "two_pointers_attempted"),
+    "three_pointers_percentage": ("three_pointers_made", "three_pointers_attempted"),
+    "free_throws_percentage": ("free_throws_made", "free_throws_attempted"),
+}
+MAXIMUMS = {"biggest_lead", "biggest_scoring_run"}
+# A player counts as having played if any of these is non-zero.
+APPEARANCE_STATS = ("minutes", "points", "field_goals_attempted", "rebounds_total", "fouls_personal")
+IGNORED = {"pno", "field_goals_effective_percentage", "turnovers_percentage"}
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _team_summary(game: Game, team: Team, opponent: Team) -> dict:
+    shooting: Dict[str, List[int]] = {}
+    points_by_period: Dict[str, int] = {}
+    for action in game.actions.by_team.get(team.number, ()):
+        if action.action_type not in POINTS:
+            continue
+        if action.action_type in FIELD_GOALS and action.area:
+            made_attempted = shooting.setdefault(action.area, [0, 0])
+            made_attempted[0] += bool(action.success)
+            made_attempted[1] += 1
+        if action.success:
+            prefix = "OT" if action.period_type == PeriodType.OVERTIME else "P"
+            period = f"{prefix}{action.period}"
+            points_by_period[period] = points_by_period.get(period, 0) + POINTS[action.action_type]
+    return {
+        "code": team.code,
+        "name": team.name,
+        "is_home": bool(team.is_home),
+        "won": team.game_stats.points > opponent.game_stats.points,
+        "stats": asdict(team.game_stats),
+        "players": [
+            {"name": player.full_name, "shirt": player.shirt, "stats": asdict(player.stats)}
+            for player in (team.players or {}).values()
+            if player.stats is not None
+        ],
+        "shooting_by_area": shooting,
+        "points_by_period": points_by_period,
+    }
+
+
+def analyze_recording(path: str) -> Optional[dict]:
+    """Run a recorded game through a headless `NCAALiveStats`.
+
+    Args:
+        path (str): JSONL recording of one game
+
+    Returns:
+        Optional[dict]: Per-game team and player results, or None if the
+            recording has no teams
+    """
+    stats = NCAALiveStats(output=None, decoder="auto")
+    # Each box score carries the full totals, so only the last one is applied.
+    last_boxscore = None
+    with open(path, "rb") as f:
+        for line in f:
+            if b'"boxscore"' in line:
+                last_boxscore = line
+            elif line.strip():
+                stats.receive(line)
+    if last_boxscore is not None:
+        stats.receive(last_boxscore)
+    game = stats.game
+    if game.home_team is None or game.away_team is None:
+        return None
+    return {
+        "match_number": game.match_number,
+        "teams": [
+            _team_summary(game, game.home_team, game.away_team),
+            _team_summary(game, game.away_team, game.home_team),
+        ],
+    }
+
+
+def _analyze_cached(job: tuple) -> tuple:
+    path, digest, cache_dir = job
+    try:
+        result = analyze_recording(path)
+    except Exception as e:
+        logger.error(f"Could not analyze {path}: {e!r}")
+        return path, None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"{digest}.json")
+        with open(cache_path + ".tmp", "w") as f:
+            json.dump({"version": CACHE_VERSION, "result": result}, f)
+        os.replace(cache_path + ".tmp", cache_path)
+    return path, result
+
+
+def _add(totals: dict, stats: dict) -> None:
+    for key, value in stats.items():
+        if key in IGNORED or key in RATIOS or not isinstance(value, (int, float)):
+            continue
+        if key in MAXIMUMS:
+            totals[key] = max(totals.get(key, 0), value)
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def _finish(totals: dict) -> dict:
+    for key, (made, attempted) in RATIOS.items():
+        if attempted in totals:
+            totals[key] = totals.get(made, 0) / totals[attempted] * 100 if totals[attempted] else 0.0
+    return totals
+
+
+class Season:
+    """Season aggregates merged from per-game results."""
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.players: Dict[str, dict] = {}
+        self.teams: Dict[str, dict] = {}
+
+    def add_game(self, result: dict) -> None:
+        self.games += 1
+        for team in result["teams"]:
+            entry = self.teams.setdefault(
+                team["code"],
+                {
+                    "name": team["name"],
+                    "games": 0,
+                    "wins": 0,
+                    "totals": {},
+                    "splits": {"home": {}, "away": {}},
+                    "shooting_by_area": {},
+                    "points_by_period": {},
+                },
+            )
+            entry["games"] += 1
+            entry["wins"] += team["won"]
+            _add(entry["totals"], team["stats"])
+            _add(entry["splits"]["home" if team["is_home"] else "away"], team["stats"])
+            for area, (made, attempted) in team["shooting_by_area"].items():
+                area_totals = entry["shooting_by_area"].setdefault(area, [0, 0])
+                area_totals[0] += made
+                area_totals[1] += attempted
+            _add(entry["points_by_period"], team["points_by_period"])
+
+            for player in team["players"]:
+                if not any(player["stats"].get(k) for k in APPEARANCE_STATS):
+                    continue
+                key = f"{team['code']}:{player['name']}"
+                player_entry = self.players.setdefault(
+                    key, {"name": player["name"], "team": team["code"], "games": 0, "totals": {}}
+                )
+                player_entry["games"] += 1
+                _add(player_entry["totals"], player["stats"])
+
+    def to_dict(self) -> dict:
+        teams = {}
+        for code, entry in self.teams.items():
+            teams[code] = {
+                **entry,
+                "losses": entry["games"] - entry["wins"],
+                "totals": _finish(dict(entry["totals"])),
+                "splits": {k: _finish(dict(v)) for k, v in entry["splits"].items()},
+                "shooting_by_area": {
+                    area: {
+                        "made": made,
+                        "attempted": attempted,
+                        "percentage": made / attempted * 100 if attempted else 0.0,
+                    }
+                    for area, (made, attempted) in entry["shooting_by_area"].items()
+                },
+            }
+        players = {
+            key: {**entry, "totals": _finish(dict(entry["totals"]))}
+            for key, entry in self.players.items()
+        }
+        return {"games": self.games, "teams": teams, "players": players}
+
+
+def analyze_directory(
+    directory: str,
+    pattern: str = "*.jsonl",
+    processes: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+) -> Season:
+    """Analyze every recording in a directory and merge them into a `Season`.
+
+    Recordings are spread over a process pool. Each result is cached by the
+    SHA-256 of the recording, so a re-run only processes new or changed files.
+
+    Args:
+        directory (str): Directory of JSONL recordings, one game per file
+        pattern (str, optional): Glob for recordings. Defaults to "*.jsonl".
+        processes (int, optional): Worker processes. Defaults to the CPU count.
+        cache_dir (str, optional): Result cache. Defaults to `.ncaa-cache` in
+            `directory`. Pass "" to disable caching.
+
+    Returns:
+        Season: Aggregates over every game that could be analyzed
+    """
+    start = time.perf_counter()
+    if cache_dir is None:
+        cache_dir = os.path.join(directory, ".ncaa-cache")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+
+    season = Season()
+    jobs = []
+    cached = 0
+    for path in paths:
+        digest = file_hash(path)
+        cache_path = os.path.join(cache_dir, f"{digest}.json") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                entry = json.load(f)
+            if entry.get("version") == CACHE_VERSION:
+                cached += 1
+                if entry["result"] is not None:
+                    season.add_game(entry["result"])
+                continue
+        jobs.append((path, digest, cache_dir or None))
+
+    if jobs:
+        processes = min(processes or os.cpu_count() or 1, len(jobs))
+        with multiprocessing.Pool(processes) as pool:
+            for path, result in pool.imap_unordered(_analyze_cached, jobs, chunksize=4):
+                if result is not None:
+                    season.add_game(result)
+
+    logger.info(
+        f"Analyzed {len(jobs)} recordings ({cached} cached) from {directory} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return season
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Season aggregates from a directory of recordings.")
+    parser.add_argument("directory", help="directory of JSONL recordings")
+    parser.add_argument("--pattern", default="*.jsonl")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None, help='result cache, "" to disable')
+    parser.add_argument("--output", default=None, help="write aggregates to this JSON file")
+    args = parser.parse_args(argv)
+
+    season = analyze_directory(args.directory, args.pattern, args.processes, args.cache_dir)
+    summary = json.dumps(season.to_dict(), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(summary)
+    else:
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
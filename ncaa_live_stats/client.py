@@ -0,0 +1,172 @@
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from .main import UNKNOWN_TYPE, NCAALiveStats
+
+if TYPE_CHECKING:
+    from .journal import Journal
+    from .watchdog import FeedWatchdog
+
+
+DEFAULT_PORT = 7677
+DEFAULT_TYPES = "se,ac,mi,te,sc,pbp,box"
+FRAME_DELIMITER = b"\r\n"
+MAX_FRAME_SIZE = 2097152
+
+# Abbreviations accepted in the `types` handshake parameter.
+FEED_TYPE_CODES = {
+    "se": "setup",
+    "ac": "action",
+    "mi": "matchInformation",
+    "te": "teams",
+    "sc": "status",
+    "pbp": "playbyplay",
+    "box": "boxscore",
+}
+
+
+class FeedClient:
+    """asyncio client for the Genius Sports TV feed.
+
+    Connects to the feed, sends the `parameters` handshake, splits the
+    stream into CRLF-delimited frames and hands each decoded message to
+    an `NCAALiveStats` instance. Lost connections are re-established with
+    exponential backoff until `stop()` is called.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        stats: Optional[NCAALiveStats] = None,
+        types: str = DEFAULT_TYPES,
+        playbyplay_on_connect: bool = True,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        journal: Optional["Journal"] = None,
+        watchdog: Optional["FeedWatchdog"] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.stats = stats if stats is not None else NCAALiveStats()
+        self.types = types
+        self.playbyplay_on_connect = playbyplay_on_connect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.journal = journal
+        self.watchdog = watchdog
+        if watchdog is not None:
+            watchdog.client = self
+        self.connected = False
+        self.messages_received = 0
+        self.busy_time = 0.0
+        self._running = False
+        self._stopped: Optional[asyncio.Event] = None
+        self._backoff = reconnect_delay
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def handshake(self) -> bytes:
+        params = {
+            "type": "parameters",
+            "types": self.types,
+            "playbyplayOnConnect": int(self.playbyplay_on_connect),
+        }
+        return json.dumps(params).encode("utf-8")
+
+    async def _read_frames(self, reader: asyncio.StreamReader) -> None:
+        while self._running:
+            try:
+                frame = await reader.readuntil(FRAME_DELIMITER)
+            except asyncio.LimitOverrunError as e:
+                # Drop the oversized frame and resync on the next delimiter.
+                logger.error(f"Frame exceeded {MAX_FRAME_SIZE} bytes, skipping")
+                await reader.readexactly(e.consumed)
+                continue
+            # The parser's decoder accepts the frame with its trailing CRLF,
+            # so it is decoded without being sliced or copied.
+            start = time.process_time()
+            try:
+                message_type = self.stats.receive(frame)
+            except Exception:
+                # Raised by an inline listener after the message was
+                # applied, so it is still journaled and observed.
+                logger.exception(f"Listener failed on a frame from {self.host}:{self.port}")
+                message_type = UNKNOWN_TYPE
+            if message_type is None:
+                logger.error(f"Could not decode frame from {self.host}:{self.port}")
+                continue
+            try:
+                if self.journal is not None:
+                    self.journal.record(frame, message_type)
+                if self.watchdog is not None:
+                    self.watchdog.observe(message_type)
+            except Exception:
+                logger.exception(f"Could not record a frame from {self.host}:{self.port}")
+            self.busy_time += time.process_time() - start
+            self.messages_received += 1
+
+    async def _connect_once(self) -> None:
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, limit=MAX_FRAME_SIZE
+        )
+        self._writer = writer
+        try:
+            writer.write(self.handshake)
+            await writer.drain()
+            self.connected = True
+            self._backoff = self.reconnect_delay
+            if self.watchdog is not None:
+                self.watchdog.reset()
+            logger.info(f"Connected to feed at {self.host}:{self.port}")
+            await self._read_frames(reader)
+        finally:
+            self.connected = False
+            self._writer = None
+            writer.close()
+
+    async def run(self) -> None:
+        """Consume the feed until `stop()` is called, reconnecting on failure."""
+        self._running = True
+        self._stopped = asyncio.Event()
+        watching = asyncio.ensure_future(self.watchdog.run()) if self.watchdog is not None else None
+        try:
+            while self._running:
+                try:
+                    await self._connect_once()
+                except (OSError, asyncio.IncompleteReadError) as e:
+                    if self._running:
+                        logger.warning(
+                            f"Feed {self.host}:{self.port} disconnected: {e!r}"
+                        )
+                if not self._running:
+                    break
+                delay = self._backoff
+                logger.info(f"Reconnecting to {self.host}:{self.port} in {delay:.1f}s")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                self._backoff = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            if watching is not None:
+                watching.cancel()
+
+    def reconnect(self) -> None:
+        """Drop the current connection; `run` connects again after the usual delay."""
+        if self._writer is not None:
+            logger.warning(f"Forcing reconnect to {self.host}:{self.port}")
+            self._writer.close()
+
+    def stop(self) -> None:
+        """Stop consuming and close the current connection, if any."""
+        self._running = False
+        if self._stopped is not None:
+            self._stopped.set()
+        if self._writer is not None:
+            self._writer.close()
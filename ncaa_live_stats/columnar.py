@@ -0,0 +1,197 @@
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .structs import Action, ActionType, Game, PeriodType
+
+SHOT_TYPES = (ActionType.TWOPT, ActionType.THREEPT, ActionType.FREETHROW)
+ACTION_TYPES = list(ActionType)
+ACTION_TYPE_CODES = {action_type: i for i, action_type in enumerate(ACTION_TYPES)}
+MISSING = -1
+
+
+class ColumnarActions:
+    """Mirrors `Game.actions` into growable NumPy columns.
+
+    Register it with `NCAALiveStats.add_action_observer` (or use
+    `NCAALiveStats.enable_columnar()`) and it is kept in sync one row per
+    action, with corrections overwriting their row in place. Action types,
+    sub types and areas are stored as categorical codes.
+
+    Requires numpy.
+    """
+
+    COLUMNS = {
+        "action_number": "i4",
+        "team_number": "i1",
+        "player_number": "i2",
+        "period": "i1",
+        "overtime": "?",
+        "action_type": "i1",
+        "sub_type": "i2",
+        "area": "i2",
+        "success": "?",
+        "x": "f4",
+        "y": "f4",
+    }
+
+    def __init__(self, capacity: int = 512) -> None:
+        if np is None:
+            raise ImportError("ColumnarActions requires numpy, install it with `pip install numpy`")
+        self._columns = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()
+        }
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+        self.sub_types: List[str] = []
+        self.areas: List[str] = []
+        self._sub_type_codes: Dict[str, int] = {}
+        self._area_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, name: str) -> "np.ndarray":
+        """A column trimmed to the rows in use (a view, not a copy)."""
+        return self._columns[name][: self._size]
+
+    @staticmethod
+    def _code(value: Optional[str], codes: Dict[str, int], categories: List[str]) -> int:
+        if value is None:
+            return MISSING
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(categories)
+            categories.append(value)
+        return code
+
+    def _write(self, row: int, action: Action) -> None:
+        c = self._columns
+        c["action_number"][row] = action.action_number or 0
+        c["team_number"][row] = action.team_number if action.team_number is not None else MISSING
+        c["player_number"][row] = action.player_number if action.player_number is not None else MISSING
+        c["period"][row] = action.period or 0
+        c["overtime"][row] = action.period_type == PeriodType.OVERTIME
+        c["action_type"][row] = ACTION_TYPE_CODES.get(action.action_type, MISSING)
+        c["sub_type"][row] = self._code(action.sub_type, self._sub_type_codes, self.sub_types)
+        c["area"][row] = self._code(action.area, self._area_codes, self.areas)
+        c["success"][row] = bool(action.success)
+        c["x"][row] = action.x if action.x is not None else np.nan
+        c["y"][row] = action.y if action.y is not None else np.nan
+
+    def _grow(self) -> None:
+        capacity = len(self._columns["action_number"]) * 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+
+    def apply(self, action: Action, game: Game) -> None:
+        row = self._rows.get(action.action_number) if action.action_number else None
+        if row is None:
+            if self._size == len(self._columns["action_number"]):
+                self._grow()
+            row = self._size
+            self._size += 1
+            if action.action_number:
+                self._rows[action.action_number] = row
+        self._write(row, action)
+
+    def retract(self, action: Action, game: Game) -> None:
+        # The corrected revision overwrites the same row in apply().
+        pass
+
+    def extend(self, actions: List[Action], game: Game) -> None:
+        for action in actions:
+            self.apply(action, game)
+
+    def clear(self) -> None:
+        self._size = 0
+        self._rows.clear()
+
+    def reset(self, game: Game) -> None:
+        self.clear()
+        self.extend(game.actions, game)
+
+    # Queries
+
+    def mask(
+        self,
+        team_number: Optional[int] = None,
+        player_number: Optional[int] = None,
+        action_type: Optional[ActionType] = None,
+        period: Optional[int] = None,
+        shots: bool = False,
+    ) -> "np.ndarray":
+        """Boolean row mask combining the given filters."""
+        mask = np.ones(self._size, dtype=bool)
+        if team_number is not None:
+            mask &= self["team_number"] == team_number
+        if player_number is not None:
+            mask &= self["player_number"] == player_number
+        if action_type is not None:
+            mask &= self["action_type"] == ACTION_TYPE_CODES[action_type]
+        if period is not None:
+            mask &= self["period"] == period
+        if shots:
+            mask &= np.isin(self["action_type"], [ACTION_TYPE_CODES[t] for t in SHOT_TYPES])
+        return mask
+
+    @staticmethod
+    def _shooting(made: "np.ndarray", attempts: "np.ndarray") -> dict:
+        return {
+            "made": int(made),
+            "attempted": int(attempts),
+            "percentage": float(made / attempts * 100) if attempts else 0.0,
+        }
+
+    def shooting_by_area(self, team_number: Optional[int] = None) -> Dict[str, dict]:
+        """Field goal makes, attempts and percentage per shot area."""
+        mask = self.mask(team_number=team_number, shots=True)
+        mask &= self["action_type"] != ACTION_TYPE_CODES[ActionType.FREETHROW]
+        mask &= self["area"] != MISSING
+        areas = self["area"][mask]
+        attempts = np.bincount(areas, minlength=len(self.areas))
+        made = np.bincount(areas, weights=self["success"][mask], minlength=len(self.areas))
+        return {
+            area: self._shooting(made[code], attempts[code])
+            for code, area in enumerate(self.areas)
+            if attempts[code]
+        }
+
+    def team_period_splits(self) -> Dict[int, Dict[Tuple[PeriodType, int], dict]]:
+        """Shooting per team per period.
+
+        Periods are keyed `(period_type, period)`, so the first overtime is
+        `(PeriodType.OVERTIME, 1)` and not confused with the first half.
+        """
+        mask = self.mask(shots=True) & (self["team_number"] > 0)
+        # One group code per (team, overtime, period), counted in one pass.
+        group = (
+            self["team_number"][mask].astype(np.int64) * 512
+            + self["overtime"][mask].astype(np.int64) * 256
+            + self["period"][mask].astype(np.int64)
+        )
+        groups, index = np.unique(group, return_inverse=True)
+        attempts = np.bincount(index, minlength=len(groups))
+        made = np.bincount(index, weights=self["success"][mask], minlength=len(groups))
+        splits: Dict[int, Dict[Tuple[PeriodType, int], dict]] = {}
+        for i, code in enumerate(groups.tolist()):
+            team, overtime, period = code // 512, code // 256 % 2, code % 256
+            period_type = PeriodType.OVERTIME if overtime else PeriodType.REGULAR
+            splits.setdefault(team, {})[(period_type, period)] = self._shooting(made[i], attempts[i])
+        return splits
+
+    def player_shooting(self, team_number: int) -> Dict[int, dict]:
+        """Makes and attempts (all shot types) per player on a team."""
+        mask = self.mask(team_number=team_number, shots=True) & (self["player_number"] >= 0)
+        players = self["player_number"][mask].astype(np.int64)
+        attempts = np.bincount(players)
+        made = np.bincount(players, weights=self["success"][mask])
+        return {
+            pno: self._shooting(made[pno], attempts[pno])
+            for pno in np.nonzero(attempts)[0].tolist()
+        }
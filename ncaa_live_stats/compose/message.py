@@ -1,8 +1,9 @@
-from typing import Callable, Optional
+import weakref
+from typing import Callable, Dict, Optional
 
 import inflection
 from loguru import logger
-from ..structs import Action, ActionType, Game, Player
+from ..structs import Action, ActionType, Game, Player, Team
 
 
 # CONSTANTS
@@ -39,6 +40,9 @@ ACTION_LITERALS = {
 }
 
 
+TITLES = {s: inflection.titleize(s) for s in [*EXPANSIONS, *EXPANSIONS.values()]}
+
+
 class term:
     HEADER = "\033[95m"
     OKBLUE = "\033[94m"
@@ -78,6 +82,21 @@ def expand(s: str) -> str:
     return EXPANSIONS.get(s, s)
 
 
+def titleize(s: str) -> str:
+    """`inflection.titleize`, memoized for the handful of sub-types the feed uses.
+
+    Args:
+        s (str): Input
+
+    Returns:
+        str: Output, titleized
+    """
+    title = TITLES.get(s)
+    if title is None:
+        title = TITLES[s] = inflection.titleize(s)
+    return title
+
+
 # HANDLERS
 
 
@@ -92,9 +111,38 @@ def get_action_code(action: Action, game: Game) -> str:
     return game.get_team_by_number(action.team_number).code
 
 
+class TeamLabels:
+    """Pre-rendered labels for a team and its roster."""
+
+    def __init__(self, team: Team) -> None:
+        self.players_dict = team.players
+        self.name = f"{term.BOLD}{team.name}{term.ENDC}"
+        self.players = {
+            pno: f"{term.UNDERLINE}{term.BOLD}{player.full_name} [{team.code}]{term.ENDC}"
+            for pno, player in (team.players or {}).items()
+        }
+
+
+# Kept here rather than on the Team, so labels never end up in checkpoints.
+# Teams are unhashable dataclasses, so entries are keyed by id and removed
+# when the team is collected.
+_TEAM_LABELS: Dict[int, TeamLabels] = {}
+
+
+def team_labels(team: Team) -> TeamLabels:
+    """Get the labels for `team`, built on first use after each new roster."""
+    key = id(team)
+    labels = _TEAM_LABELS.get(key)
+    if labels is None or labels.players_dict is not team.players:
+        if labels is None:
+            weakref.finalize(team, _TEAM_LABELS.pop, key, None)
+        labels = _TEAM_LABELS[key] = TeamLabels(team)
+    return labels
+
+
 def get_player_string(action: Action, game: Game) -> str:
-    player = get_action_player(action, game)
-    return f"{term.UNDERLINE}{term.BOLD}{player.full_name} [{get_action_code(action, game)}]{term.ENDC}"
+    team = game.get_team_by_number(action.team_number)
+    return team_labels(team).players[action.player_number]
 
 
 def compose_scoring_play(action: Action, game: Game) -> str:
@@ -119,11 +167,10 @@ def compose_simple_action(action: Action, game: Game, kind: str = "Action") -> s
 
 def compose_rebound(action: Action, game: Game) -> str:
     if action.player_number == 0:
-        team = game.get_team_by_number(action.team_number)
-        name = f"{term.BOLD}{team.name}{term.ENDC}"
+        name = team_labels(game.get_team_by_number(action.team_number)).name
     else:
         name = get_player_string(action, game)
-    subtype = inflection.titleize(action.sub_type)
+    subtype = titleize(action.sub_type)
     return f"{subtype} rebound by {name}."
 
 
@@ -143,7 +190,7 @@ def compose_foul(action: Action, game: Game) -> str:
             name = team.name
     else:
         name = get_player_string(action, game)
-    response = f"{inflection.titleize(expand(action.sub_type))} foul on {term.BOLD}{name}{term.ENDC}."
+    response = f"{titleize(expand(action.sub_type))} foul on {term.BOLD}{name}{term.ENDC}."
     qualifiers = set(action.qualifiers.copy())
     for ft_kind in ["1freethrow", "2freethrow", "3freethrow", "oneandone"]:
         if ft_kind in qualifiers:
@@ -163,9 +210,9 @@ def compose_timeout(action: Action, game: Game) -> str:
             return f"{term.BOLD}{term.FAIL}MEDIA TIMEOUT.{term.ENDC}"
         return "Timeout taken by the officials."
     else:
-        team = game.get_team_by_number(action.team_number)
+        name = team_labels(game.get_team_by_number(action.team_number)).name
         duration = "60s" if action.sub_type == "full" else "30s"
-        return f"{duration} timeout taken by {term.BOLD}{team.name}{term.ENDC}."
+        return f"{duration} timeout taken by {name}."
 
 
 MESSAGES: dict[ActionType, Callable] = {
@@ -182,6 +229,8 @@ MESSAGES: dict[ActionType, Callable] = {
     ActionType.TIMEOUT: compose_timeout,
 }
 
+_UNHANDLED = set()
+
 
 def compose_action_message(action: Action, game: Game) -> str:
     handler = MESSAGES.get(action.action_type)
@@ -189,7 +238,9 @@ def compose_action_message(action: Action, game: Game) -> str:
         message = handler(action, game)
         if message:
             return f"{term.HEADER}[{action.period_norm} {action.clock_norm} {action.action_number}]{term.ENDC} {message}"
-    else:
+    elif action.action_type not in _UNHANDLED:
+        # Log each unknown type once rather than for every action.
+        _UNHANDLED.add(action.action_type)
         logger.error(f"UNHANDLED ACTION TYPE {action.action_type}")
         logger.error(action)
     return ""
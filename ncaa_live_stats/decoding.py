@@ -0,0 +1,160 @@
+import json
+from typing import Any, Callable, Dict, Tuple, Union
+
+from . import schema, structs
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+class JSONDecoder:
+    """Decodes raw feed frames with the standard library `json` module.
+
+    `decode` returns the message type and the message to hand to its
+    `NCAALiveStats` handler: a dict, or for typed backends a decoded struct.
+    """
+
+    name = "json"
+
+    def __init__(self, raw_timestamps: bool = False) -> None:
+        self.raw_timestamps = raw_timestamps
+
+    @staticmethod
+    def loads(frame: bytes) -> Any:
+        return json.loads(frame)
+
+    def decode(self, frame: bytes) -> Tuple[str, Any]:
+        message = self.loads(frame)
+        return message.get("type"), message
+
+
+class OrjsonDecoder(JSONDecoder):
+    """Decodes frames to dicts with orjson."""
+
+    name = "orjson"
+
+    def __init__(self, raw_timestamps: bool = False) -> None:
+        if orjson is None:
+            raise ImportError("The orjson decoder requires orjson, install it with `pip install orjson`")
+        super().__init__(raw_timestamps)
+        self.loads = orjson.loads
+
+
+def _raw_action_struct():
+    # One attribute per flat ACTION field, named like the Action field and
+    # renamed to its feed key. Values are left as decoded (Any) so the
+    # schema casts apply exactly as for dicts.
+    fields = [f for f in schema.ACTION if f.path is not None]
+    return msgspec.defstruct(
+        "RawAction",
+        [(f.name, Any, None) for f in fields],
+        rename={f.name: f.path for f in fields},
+    )
+
+
+class MsgspecDecoder(JSONDecoder):
+    """Decodes `action` and `playbyplay` frames straight into `structs.Action`.
+
+    Those frames are parsed by msgspec into a struct holding only the
+    fields the schema reads, then converted by a decoder compiled from
+    `schema.ACTION`, with no intermediate dict. Every other type is
+    decoded into a dict, as with the other backends.
+
+    An action the schema cannot convert is handed over as a dict instead,
+    so the handler logs and drops it exactly as it would with any other
+    backend.
+    """
+
+    name = "msgspec"
+
+    def __init__(self, raw_timestamps: bool = False) -> None:
+        if msgspec is None:
+            raise ImportError("The msgspec decoder requires msgspec, install it with `pip install msgspec`")
+        super().__init__(raw_timestamps)
+        raw_action = _raw_action_struct()
+        tagged_action = msgspec.defstruct(
+            "ActionMessage", [], bases=(raw_action,), tag_field="type", tag="action"
+        )
+        playbyplay = msgspec.defstruct(
+            "PlaybyplayMessage",
+            [("actions", list[raw_action], [])],
+            tag_field="type",
+            tag="playbyplay",
+        )
+        self._typed = msgspec.json.Decoder(Union[tagged_action, playbyplay])
+        self._tagged_action = tagged_action
+        self._generic = msgspec.json.Decoder()
+        self.loads = self._generic.decode
+        fields = schema.ACTION_FEED_TIMES if raw_timestamps else schema.ACTION
+        self._to_action = schema.compile_decoder(structs.Action, fields, attributes=True)
+
+    def _convert(self, raw: Any) -> Any:
+        try:
+            return self._to_action(raw)
+        except Exception:
+            return msgspec.to_builtins(raw)
+
+    def decode(self, frame: bytes) -> Tuple[str, Any]:
+        # Only frames that may be actions are tried against the typed
+        # union, so other types are parsed once rather than twice.
+        if b'"action"' in frame or b'"playbyplay"' in frame:
+            try:
+                message = self._typed.decode(frame)
+            except msgspec.ValidationError:
+                pass
+            else:
+                if type(message) is self._tagged_action:
+                    return "action", self._convert(message)
+                convert = self._convert
+                return "playbyplay", {"actions": [convert(a) for a in message.actions]}
+        message = self._generic.decode(frame)
+        return message.get("type"), message
+
+
+DECODERS: Dict[str, Callable[..., JSONDecoder]] = {
+    "json": JSONDecoder,
+    "orjson": OrjsonDecoder,
+    "msgspec": MsgspecDecoder,
+}
+
+
+# Picked by "auto", first installed wins. orjson measures fastest on live
+# traffic (benchmarks/bench_decode.py); msgspec's typed actions do not make
+# up for its slower generic path.
+AUTO_PREFERENCE = ("orjson", "msgspec", "json")
+
+
+def available_decoders() -> list:
+    """Names of the decoders whose libraries are installed."""
+    installed = {"json": True, "orjson": orjson is not None, "msgspec": msgspec is not None}
+    return [name for name in DECODERS if installed[name]]
+
+
+def get_decoder(decoder: Union[str, JSONDecoder] = "json", raw_timestamps: bool = False) -> JSONDecoder:
+    """Get a frame decoder by name.
+
+    Args:
+        decoder (str | JSONDecoder, optional): "json", "orjson", "msgspec", "auto"
+            for the first installed one in `AUTO_PREFERENCE`, or a decoder
+            instance. Defaults to "json".
+        raw_timestamps (bool, optional): Decode action timestamps as `FeedTime`.
+
+    Returns:
+        JSONDecoder: The decoder
+    """
+    if not isinstance(decoder, str):
+        return decoder
+    if decoder == "auto":
+        available = available_decoders()
+        decoder = next(name for name in AUTO_PREFERENCE if name in available)
+    try:
+        return DECODERS[decoder](raw_timestamps)
+    except KeyError:
+        raise ValueError(f"Unknown decoder {decoder!r}, expected one of {list(DECODERS)}")
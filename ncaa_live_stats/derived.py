@@ -0,0 +1,139 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from .structs import Action, ActionType, DerivedStats, Game, PeriodType, Setup
+
+POINTS = {ActionType.TWOPT: 2, ActionType.THREEPT: 3, ActionType.FREETHROW: 1}
+DEFAULT_SETUP = Setup(periods=2, period_length=20, extra_time_length=5)
+
+
+def clock_seconds(clock: str) -> float:
+    """Seconds remaining from a feed clock such as `09:23:00` (mm:ss:cc)."""
+    parts = clock.split(":")
+    seconds = int(parts[0]) * 60 + int(parts[1])
+    if len(parts) > 2:
+        seconds += int(parts[2]) / 100
+    return seconds
+
+
+def elapsed_seconds(action: Action, setup: Optional[Setup] = None) -> Optional[float]:
+    """Game seconds elapsed at the time of `action`, or None if it has no clock.
+
+    Args:
+        action (Action): Action to place on the game timeline
+        setup (Setup, optional): Period lengths. NCAA halves are assumed if missing.
+
+    Returns:
+        Optional[float]: Seconds since tip-off
+    """
+    if not action.clock or not action.period:
+        return None
+    setup = setup if setup and setup.period_length else DEFAULT_SETUP
+    length = setup.period_length * 60
+    try:
+        remaining = clock_seconds(action.clock)
+    except ValueError:
+        return None
+    if action.period_type == PeriodType.OVERTIME:
+        extra = (setup.extra_time_length or DEFAULT_SETUP.extra_time_length) * 60
+        start = (setup.periods or DEFAULT_SETUP.periods) * length + (action.period - 1) * extra
+        return start + extra - remaining
+    return (action.period - 1) * length + length - remaining
+
+
+def apply_action(derived: DerivedStats, action: Action, elapsed: Optional[float]) -> None:
+    """Fold one action into `derived` in place."""
+    if elapsed is not None and (derived.last_elapsed is None or elapsed > derived.last_elapsed):
+        derived.last_elapsed = elapsed
+    if not action.is_scoring_play or action.team_number not in (1, 2):
+        return
+
+    team = action.team_number
+    points = POINTS[action.action_type]
+    if action.score1 or action.score2:
+        derived.score1, derived.score2 = action.score1 or 0, action.score2 or 0
+    elif team == 1:
+        derived.score1 += points
+    else:
+        derived.score2 += points
+
+    lead = derived.score1 - derived.score2
+    leader = 1 if lead > 0 else 2 if lead < 0 else 0
+    if leader == 0:
+        derived.times_tied += 1
+    elif leader != derived.leader and derived.leader != 0:
+        derived.lead_changes += 1
+    if leader:
+        derived.leader = leader
+        derived.largest_lead[leader] = max(derived.largest_lead.get(leader, 0), abs(lead))
+
+    if derived.run_team == team:
+        derived.run_points += points
+    else:
+        derived.run_team, derived.run_points = team, points
+    derived.longest_run[team] = max(derived.longest_run.get(team, 0), derived.run_points)
+
+    if elapsed is not None:
+        derived.last_score[team] = elapsed
+        if action.is_non_free_throw_scoring_play:
+            derived.last_field_goal[team] = elapsed
+
+
+class DerivedStatsEngine:
+    """Keeps `Game.derived` up to date as actions are stored.
+
+    Each action is folded in O(1). The state before each of the last
+    `history` actions is kept so a correction to a recent action is undone
+    by restoring that state and re-folding the few actions after it. Older
+    corrections fall back to a rebuild over `Game.actions`.
+    """
+
+    def __init__(self, history: int = 32) -> None:
+        self._undo: Deque[Tuple[Action, DerivedStats]] = deque(maxlen=history)
+        self._pending: Optional[List[Action]] = None
+        self._rebuilt: Optional[int] = None
+
+    def _fold(self, action: Action, game: Game) -> None:
+        self._undo.append((action, game.derived.copy()))
+        apply_action(game.derived, action, elapsed_seconds(action, game.setup))
+
+    def apply(self, action: Action, game: Game) -> None:
+        if self._rebuilt is not None and self._rebuilt == action.action_number:
+            # The rebuild in retract() already folded this revision in place.
+            self._rebuilt = None
+            return
+        self._fold(action, game)
+        if self._pending:
+            for later in self._pending:
+                self._fold(later, game)
+        self._pending = None
+
+    def retract(self, action: Action, game: Game) -> None:
+        entries = list(self._undo)
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i][0] is action:
+                game.derived = entries[i][1]
+                self._pending = [a for a, _ in entries[i + 1:]]
+                for _ in range(len(entries) - i):
+                    self._undo.pop()
+                return
+        self.rebuild(game)
+        self._rebuilt = action.action_number
+
+    def reset(self, game: Game) -> None:
+        """Recompute from a play-by-play loaded all at once."""
+        self._rebuilt = None
+        self.rebuild(game)
+
+    def rebuild(self, game: Game) -> None:
+        """Recompute `game.derived` from scratch over every stored action."""
+        self._undo.clear()
+        self._pending = None
+        game.derived = DerivedStats()
+        # Only the last `history` snapshots would survive in the undo deque.
+        snapshot_from = len(game.actions) - self._undo.maxlen
+        for i, action in enumerate(game.actions):
+            if i >= snapshot_from:
+                self._fold(action, game)
+            else:
+                apply_action(game.derived, action, elapsed_seconds(action, game.setup))
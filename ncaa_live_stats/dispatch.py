@@ -0,0 +1,267 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Literal, Optional, Tuple
+
+from loguru import logger
+
+Mode = Literal["async", "thread"]
+Policy = Literal["coalesce", "drop_oldest", "drop_newest"]
+
+
+def _percentile(samples: Iterable[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class ListenerStats:
+    """Counters and recent latencies (in seconds) for one dispatched listener."""
+
+    name: str
+    calls: int = 0
+    errors: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    run_times: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    queue_delays: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "run_p50": _percentile(self.run_times, 0.5),
+            "run_p99": _percentile(self.run_times, 0.99),
+            "delay_p50": _percentile(self.queue_delays, 0.5),
+            "delay_p99": _percentile(self.queue_delays, 0.99),
+        }
+
+
+def _merge(old: tuple, new: tuple) -> tuple:
+    # Listener arguments are the game (always the same object) and, for
+    # change listeners, a list of changes, which accumulate.
+    return tuple(o + n if isinstance(o, list) else n for o, n in zip(old, new))
+
+
+class _Worker:
+    """Runs one listener off the ingest path from a bounded backlog."""
+
+    def __init__(self, func: Callable, stats: ListenerStats, max_queue: int, policy: Policy) -> None:
+        self.func = func
+        self.stats = stats
+        self.max_queue = max_queue
+        self.policy = policy
+        self.pending: Deque[Tuple[float, tuple]] = deque()
+
+    def _enqueue(self, args: tuple) -> bool:
+        """Add a call to the backlog, returns False if it was dropped."""
+        stats = self.stats
+        if len(self.pending) >= self.max_queue:
+            if self.policy == "drop_newest":
+                stats.dropped += 1
+                return False
+            if self.policy == "drop_oldest":
+                self.pending.popleft()
+                stats.dropped += 1
+            else:
+                enqueued, merged = self.pending.popleft()
+                while self.pending:
+                    merged = _merge(merged, self.pending.popleft()[1])
+                    stats.coalesced += 1
+                stats.coalesced += 1
+                args = _merge(merged, args)
+                self.pending.append((enqueued, args))
+                stats.queued = 1
+                return True
+        self.pending.append((time.perf_counter(), args))
+        stats.queued = len(self.pending)
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        return True
+
+    def _started(self, enqueued: float) -> float:
+        now = time.perf_counter()
+        self.stats.queue_delays.append(now - enqueued)
+        self.stats.queued = len(self.pending)
+        return now
+
+    def _finished(self, started: float, error: Optional[BaseException]) -> None:
+        self.stats.calls += 1
+        self.stats.run_times.append(time.perf_counter() - started)
+        if error is not None:
+            self.stats.errors += 1
+            logger.opt(exception=error).error(f"Listener {self.stats.name} failed")
+
+    def close(self) -> None:
+        """Stop running the listener. Pending calls are discarded."""
+
+
+class _TaskWorker(_Worker):
+    """Runs the listener in an asyncio task on the loop calling `receive`.
+
+    Calls made with no running loop, such as a replay or a journal restore
+    before the app starts, are run inline with errors still isolated.
+    """
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.is_coroutine = inspect.iscoroutinefunction(self.func)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __call__(self, *args) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._call_inline(args)
+            return
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        if self._enqueue(args):
+            self._wakeup.set()
+
+    def _call_inline(self, args: tuple) -> None:
+        started = time.perf_counter()
+        error = None
+        try:
+            result = self.func(*args)
+            if self.is_coroutine:
+                asyncio.run(result)
+        except Exception as e:
+            error = e
+        self._finished(started, error)
+
+    async def _run(self) -> None:
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            enqueued, args = self.pending.popleft()
+            started = self._started(enqueued)
+            error = None
+            try:
+                result = self.func(*args)
+                if self.is_coroutine:
+                    await result
+            except Exception as e:
+                error = e
+            self._finished(started, error)
+            # Let the loop (and ingestion) run between calls.
+            await asyncio.sleep(0)
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class _ThreadWorker(_Worker):
+    """Runs the listener on its own daemon thread."""
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __call__(self, *args) -> None:
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"listener-{self.stats.name}", daemon=True
+                )
+                self._thread.start()
+            if self._enqueue(args):
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self.pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                enqueued, args = self.pending.popleft()
+                started = self._started(enqueued)
+            error = None
+            try:
+                self.func(*args)
+            except Exception as e:
+                error = e
+            with self._condition:
+                self._finished(started, error)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+
+class ListenerDispatcher:
+    """Runs `NCAALiveStats` listeners off the ingest path.
+
+    Each listener gets its own bounded backlog, worked through by an
+    asyncio task (`mode="async"`, which also accepts coroutine functions)
+    or a dedicated thread (`mode="thread"`). `receive` only enqueues, so
+    its latency does not depend on the listeners. When a backlog is full:
+
+    - `coalesce` merges everything pending into one call. The game is
+      shared, and change lists are concatenated.
+    - `drop_oldest` discards the oldest pending call.
+    - `drop_newest` discards the new call.
+
+    Exceptions are logged and counted instead of reaching `receive`.
+    Listeners see the game as it is when they run, which may be several
+    messages after the one that triggered them. Thread listeners read it
+    while it is being updated, so they should copy what they need.
+    """
+
+    def __init__(self, mode: Mode = "async", max_queue: int = 64, policy: Policy = "coalesce") -> None:
+        """
+        Args:
+            mode (Mode, optional): "async" or "thread". Defaults to "async".
+            max_queue (int, optional): Pending calls kept per listener. Defaults to 64.
+            policy (Policy, optional): What to do when a backlog is full. Defaults to "coalesce".
+        """
+        if mode not in ("async", "thread"):
+            raise ValueError(f"Unknown listener mode {mode!r}")
+        if policy not in ("coalesce", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown backlog policy {policy!r}")
+        self.mode = mode
+        self.max_queue = max_queue
+        self.policy = policy
+        self._workers: List[_Worker] = []
+
+    def wrap(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """Get a callable that queues calls to `func` instead of making them."""
+        name = name or getattr(func, "__qualname__", repr(func))
+        taken = {worker.stats.name for worker in self._workers}
+        unique, n = name, 1
+        while unique in taken:
+            n += 1
+            unique = f"{name}#{n}"
+        worker_class = _TaskWorker if self.mode == "async" else _ThreadWorker
+        worker = worker_class(func, ListenerStats(unique), self.max_queue, self.policy)
+        self._workers.append(worker)
+        return worker
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-listener counters and p50/p99 run time and queue delay, in seconds."""
+        return {worker.stats.name: worker.stats.summary() for worker in self._workers}
+
+    def close(self) -> None:
+        """Stop every worker. Pending calls are discarded."""
+        for worker in self._workers:
+            worker.close()
@@ -0,0 +1,172 @@
+import json
+import os
+import pickle
+import time
+from typing import Optional
+
+from loguru import logger
+from tinydb import TinyDB
+
+from .main import NCAALiveStats
+
+LOG_NAME = "events.jsonl"
+INDEX_NAME = "checkpoints.json"
+# Message types that replace, rather than add to, what earlier ones said.
+SNAPSHOT_TYPES = ("boxscore", "status")
+
+
+class Journal:
+    """Append-only log of feed messages with periodic `Game` checkpoints.
+
+    Every message except pings is appended to `events.jsonl` in the
+    directory as it is received, in the same format as a recording (see
+    `replay.iter_recording`). Every `checkpoint_every` messages the game
+    is pickled next to the log and indexed in a TinyDB table together with
+    the log offset it was taken at. `restore()` loads the newest
+    checkpoint and replays only the messages logged after it.
+
+    After a restore the feed can be joined with
+    `FeedClient(..., playbyplay_on_connect=False)`. Actions made while
+    the process was down are then only picked up if the feed resends them,
+    so skip the play-by-play only for short outages.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        stats: NCAALiveStats,
+        checkpoint_every: int = 500,
+        keep: int = 2,
+        fsync: bool = False,
+    ) -> None:
+        """
+        Args:
+            directory (str): Directory for the log, index and checkpoints of one game
+            stats (NCAALiveStats): Parser whose game is checkpointed and restored
+            checkpoint_every (int, optional): Messages between checkpoints. Defaults to 500.
+            keep (int, optional): Number of checkpoints kept on disk. Defaults to 2.
+            fsync (bool, optional): fsync the log at every checkpoint. Defaults to False.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.stats = stats
+        self.checkpoint_every = checkpoint_every
+        self.keep = keep
+        self.fsync = fsync
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self._index = TinyDB(os.path.join(directory, INDEX_NAME))
+        self._log = None
+        self._since_checkpoint = 0
+
+    def _checkpoint_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"checkpoint-{seq:06d}.pickle")
+
+    def _open_log(self):
+        if self._log is None:
+            self._log = open(self.log_path, "ab")
+        return self._log
+
+    def record(self, frame: bytes, message_type: str) -> None:
+        """Append a received message to the log.
+
+        Args:
+            frame (bytes): The raw frame, with or without its line ending
+            message_type (str): Feed type of the message, as returned by
+                `NCAALiveStats.receive`
+        """
+        if message_type == "ping":
+            return
+        log = self._open_log()
+        log.write(frame.rstrip(b"\r\n"))
+        log.write(b"\n")
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write a checkpoint of the current game at the end of the log."""
+        log = self._open_log()
+        log.flush()
+        if self.fsync:
+            os.fsync(log.fileno())
+        seq = max((c["seq"] for c in self._index.all()), default=0) + 1
+        path = self._checkpoint_path(seq)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(self.stats.game, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        self._index.insert(
+            {
+                "seq": seq,
+                "offset": log.tell(),
+                "actions": len(self.stats.game.actions),
+                "created": time.time(),
+            }
+        )
+        self._since_checkpoint = 0
+        for old in sorted(self._index.all(), key=lambda c: c["seq"])[: -self.keep]:
+            try:
+                os.remove(self._checkpoint_path(old["seq"]))
+            except FileNotFoundError:
+                pass
+            self._index.remove(doc_ids=[old.doc_id])
+
+    def latest_checkpoint(self) -> Optional[dict]:
+        checkpoints = self._index.all()
+        return max(checkpoints, key=lambda c: c["seq"]) if checkpoints else None
+
+    def restore(self) -> bool:
+        """Load the newest checkpoint into `stats` and replay the log after it.
+
+        A final line left half-written by a crash is cut off the log.
+        Corrupt lines before it are logged and skipped.
+
+        Returns:
+            bool: Whether there was anything to restore
+        """
+        if not os.path.exists(self.log_path):
+            return False
+        start = time.perf_counter()
+        checkpoint = self.latest_checkpoint()
+        offset = 0
+        if checkpoint is not None:
+            with open(self._checkpoint_path(checkpoint["seq"]), "rb") as f:
+                self.stats.load_game(pickle.load(f))
+            offset = checkpoint["offset"]
+
+        tail = []
+        with open(self.log_path, "rb") as log:
+            log.seek(offset)
+            for line in log:
+                if not line.endswith(b"\n"):
+                    # Only the last line can be torn by a crash.
+                    logger.warning(f"Truncating incomplete entry at byte {offset} of {self.log_path}")
+                    os.truncate(self.log_path, offset)
+                    break
+                try:
+                    tail.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping corrupt entry at byte {offset} of {self.log_path}")
+                offset += len(line)
+
+        # Only the newest box score and status matter, each carries the full state.
+        latest = {message.get("type"): i for i, message in enumerate(tail)}
+        replayed = 0
+        for i, message in enumerate(tail):
+            message_type = message.get("type")
+            if message_type in SNAPSHOT_TYPES and latest[message_type] != i:
+                continue
+            self.stats.receive(message)
+            replayed += 1
+
+        self._since_checkpoint = len(tail)
+        logger.info(
+            f"Restored {len(self.stats.game.actions)} actions from {self.directory} "
+            f"({replayed} messages replayed) in {time.perf_counter() - start:.3f}s"
+        )
+        return checkpoint is not None or replayed > 0
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self._index.close()
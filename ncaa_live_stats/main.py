@@ -1,18 +1,26 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 import traceback
-from dataclasses import asdict
+import json
 from datetime import datetime
-from typing import Any, Callable, List, Literal, TypeVar, DefaultDict
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Protocol, Tuple, TypeVar, DefaultDict, Union
 
 import inflection
-from dateutil.parser import parse as dt_parse
 from loguru import logger
 
-from . import structs
-from ncaa_live_stats.compose.message import compose_action_message
+from . import schema, structs
+from .decoding import JSONDecoder, get_decoder
+from .derived import DerivedStatsEngine
+from .dispatch import ListenerDispatcher
+from .metrics import Metrics, listener_name
+from .serialize import GameSerializer
+from .timestamps import as_datetime, parse_feed_time, parse_timestamp
+from .output import OutputSink, WriterSink
 
 T = TypeVar("T")
 
+# `message_counts` key for every message type without a handler.
+UNKNOWN_TYPE = "unknown"
+
 
 def nested_get(mapping: dict, value: str) -> Any:
     """Returns a deeply nested value from a dictionary
@@ -60,6 +68,25 @@ def extract(message: dict, key: str, cast_to: T = str) -> T:
         return cast_to()
 
 
+class ActionObserver(Protocol):
+    """Receives every stored action revision.
+
+    When the feed corrects an action, `retract` is called with the
+    replaced revision before `apply` is called with the new one.
+    """
+
+    def apply(self, action: structs.Action, game: structs.Game) -> None:
+        ...
+
+    def retract(self, action: structs.Action, game: structs.Game) -> None:
+        ...
+
+    # Observers may also define `reset(game)`, called instead when the
+    # whole play-by-play is loaded at once (a playbyplay message or
+    # `NCAALiveStats.load_game`). Observers without one have every action
+    # of the old play-by-play retracted before the new one is applied.
+
+
 class NCAALiveStats:
     """Parser and datastore for messages from 
     Genius Sports' NCAA Live Stats platform.
@@ -70,166 +97,411 @@ class NCAALiveStats:
     _last_ping_dt: datetime
     _teams_loaded: bool = False
     _listeners: DefaultDict[str, List[Callable]]
+    _dispatch: Dict[str, Tuple[Optional[Callable], str]]
+    _message_counts: Counter
+    _action_observers: List[ActionObserver]
+    _change_listeners: List[Tuple[Tuple, Callable]]
+    _dispatcher: Optional[ListenerDispatcher]
+    _output: Optional[OutputSink]
+    _decoder: JSONDecoder
+    _metrics: Optional[Metrics]
+
+    # Raw feed `type` -> handler method
+    _HANDLERS = {
+        "status": "_receive_status",
+        "setup": "_receive_setup",
+        "matchInformation": "_receive_match_information",
+        "teams": "_receive_teams",
+        "boxscore": "_receive_boxscore",
+        "action": "_receive_action",
+        "playbyplay": "_receive_playbyplay",
+    }
 
     @property
     def is_ready(self):
         return self._teams_loaded
 
     @property
-    def as_dict(self, kind: Literal["all", "actions"] = "all") -> dict:
-        if kind == "all":
-            return asdict(self._game)
-        elif kind == "actions":
-            return asdict(self._game.actions)
+    def message_counts(self) -> Dict[str, int]:
+        """Number of messages received so far, by feed message type.
+        Types without a handler are counted together as "unknown"."""
+        return dict(self._message_counts)
 
-    def __init__(self, debug: bool = False) -> None:
+    @property
+    def game(self) -> structs.Game:
+        """The game being tracked. Replace it with `load_game`."""
+        return self._game
+
+    @property
+    def output(self) -> Optional[OutputSink]:
+        """The sink composed play-by-play goes to, None if output is off."""
+        return self._output
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """The parser's `Metrics`, if it was created with any."""
+        return self._metrics
+
+    def as_json(self, kind: Literal["all", "actions"] = "all") -> bytes:
+        """
+        Encoded JSON snapshot of the game (or only its actions). Only the
+        teams, players and actions changed since the previous call are
+        re-encoded.
+        """
+        if self._serializer is None:
+            self._serializer = GameSerializer(self)
+        if kind == "actions":
+            return self._serializer.actions()
+        return self._serializer.snapshot()
+
+    def as_dict(self, kind: Literal["all", "actions"] = "all") -> Union[dict, list]:
+        return json.loads(self.as_json(kind))
+
+    def __init__(
+        self,
+        debug: bool = False,
+        raw_timestamps: bool = False,
+        dispatcher: Optional[ListenerDispatcher] = None,
+        output: Union[OutputSink, Literal["stdout"], None] = "stdout",
+        decoder: Union[str, JSONDecoder] = "json",
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """
+        Args:
+            debug (bool, optional): Log offending messages and tracebacks on errors.
+            raw_timestamps (bool, optional): Keep action and ping timestamps as
+                `FeedTime` epoch numbers, converted to datetime only on access.
+            dispatcher (ListenerDispatcher, optional): Run listeners off the
+                ingest path with bounded backlogs. By default they are called
+                inline from `receive`.
+            output (OutputSink, optional): Where composed play-by-play text goes.
+                Defaults to a `WriterSink` printing to stdout off the ingest
+                path. None skips composing entirely.
+            decoder (str | JSONDecoder, optional): How raw bytes frames are
+                decoded: "json", "orjson", "msgspec" or "auto". Defaults to "json".
+            metrics (Metrics, optional): Record message counts and decode,
+                handler and listener timings. Nothing is measured without it.
+        """
+        self._dispatcher = dispatcher
+        self._output = WriterSink() if output == "stdout" else output
+        self._decoder = get_decoder(decoder, raw_timestamps)
+        self._decode = self._decoder.decode
+        self._metrics = metrics
         self._game = structs.Game(actions=[])
+        self._last_ping_dt = None
+        self._serializer = None
+        if raw_timestamps:
+            self._decode_action = schema.decode_action_feed_times
+            self._parse_time = parse_feed_time
+        else:
+            self._decode_action = schema.decode_action
+            self._parse_time = parse_timestamp
         self._listeners = defaultdict(list)
         self._debug = debug
+        self._message_counts = Counter()
+        self._action_observers = [DerivedStatsEngine()]
+        self._change_listeners = []
+        self._dispatch = {
+            message_type: (getattr(self, name), inflection.underscore(message_type))
+            for message_type, name in self._HANDLERS.items()
+        }
+        if metrics is not None:
+            self._instrument(metrics)
+
+    def _instrument(self, metrics: Metrics) -> None:
+        # Timing is added by wrapping, so a parser without metrics runs
+        # exactly the same code as before.
+        known = {"ping", *self._HANDLERS}
+        metrics.messages = self._message_counts
+        self.receive = metrics.timed_receive(self.receive, known)
+        self._decode = metrics.timed_decode(self._decode, known)
+        self._dispatch = {
+            message_type: (metrics.timed(handler, "handler", message_type), key)
+            for message_type, (handler, key) in self._dispatch.items()
+        }
+        metrics.gauge("actions", lambda: len(self._game.actions), "Actions in the play-by-play")
+        if self._dispatcher is not None:
+            dispatcher = self._dispatcher
+            metrics.gauge(
+                "listener_queue_depth",
+                lambda: {name: s["queued"] for name, s in dispatcher.stats().items()},
+                "Calls waiting for each dispatched listener",
+                "listener",
+            )
+            metrics.gauge(
+                "listener_run_p99_seconds",
+                lambda: {name: s["run_p99"] for name, s in dispatcher.stats().items()},
+                "Recent p99 run time of each dispatched listener",
+                "listener",
+            )
+            metrics.gauge(
+                "listener_dropped",
+                lambda: {name: s["dropped"] for name, s in dispatcher.stats().items()},
+                "Calls dropped by each dispatched listener's policy",
+                "listener",
+            )
+        output = self._output
+        if output is not None and hasattr(output, "backlog"):
+            metrics.gauge("output_backlog", output.backlog, "Actions waiting in the output sink")
+            metrics.gauge("output_dropped", lambda: output.dropped, "Actions dropped by the output sink")
 
-    def add_listener(self, message_type: str, func: Callable) -> None:
+    def add_listener(self, message_type: str, func: Callable, inline: bool = False) -> None:
         """
         Add a callback function to the handling of a specific `message_type`.
         The function must accept one argument of type `structs.Game`.
+        Listeners are not called for status, setup, teams and box score
+        messages that did not change anything. With a `dispatcher`, the
+        call is queued unless `inline` is set.
         """
-        self._listeners[message_type].append(func)
+        key = inflection.underscore(message_type)
+        name = listener_name(func)
+        if self._dispatcher is not None and not inline:
+            func = self._dispatcher.wrap(func)
+        if self._metrics is not None:
+            func = self._metrics.timed(func, "listener", f"{key}:{name}")
+        self._listeners[key].append(func)
+
+    def add_action_observer(self, observer: ActionObserver) -> None:
+        """
+        Register an observer that is told about every action as it is stored,
+        and about the old revision whenever a correction replaces it.
+        """
+        self._action_observers.append(observer)
+
+    def enable_columnar(self) -> "ColumnarActions":
+        """
+        Mirror the play-by-play into a NumPy-backed `ColumnarActions` store,
+        kept in sync as actions arrive. Requires numpy.
+        """
+        from .columnar import ColumnarActions
+
+        columnar = ColumnarActions()
+        columnar.extend(self._game.actions, self._game)
+        self.add_action_observer(columnar)
+        return columnar
+
+    def load_game(self, game: structs.Game) -> None:
+        """
+        Replace the current game, e.g. with one restored from a checkpoint.
+        Action observers are re-synced and playbyplay listeners are called,
+        as after a full play-by-play.
+        """
+        previous = self._game
+        self._game = game
+        self._teams_loaded = game.home_team is not None and game.away_team is not None
+        self._reset_observers(previous.actions, previous)
+        for func in self._listeners.get("playbyplay", ()):
+            func(game)
+
+    def _reset_observers(self, previous: Iterable[structs.Action], previous_game: structs.Game) -> None:
+        game = self._game
+        previous = list(previous)
+        for observer in self._action_observers:
+            reset = getattr(observer, "reset", None)
+            if reset is not None:
+                reset(game)
+            else:
+                for action in previous:
+                    observer.retract(action, previous_game)
+                for action in game.actions:
+                    observer.apply(action, game)
+
+    def add_change_listener(self, func: Callable, path: Tuple = (), inline: bool = False) -> None:
+        """
+        Add a callback for field-level changes. The function must accept a
+        list of `structs.Change` and a `structs.Game`, and is only called
+        with changes whose entity path starts with `path`, e.g.
+        `("teams", 1, "players")` for every player stat on team 1.
+        With a `dispatcher`, the call is queued unless `inline` is set.
+        """
+        name = listener_name(func)
+        if self._dispatcher is not None and not inline:
+            func = self._dispatcher.wrap(func)
+        if self._metrics is not None:
+            func = self._metrics.timed(func, "listener", f"changes:{name}")
+        self._change_listeners.append((tuple(path), func))
+
+    @property
+    def last_ping(self) -> Optional[datetime]:
+        """Feed time of the most recent ping."""
+        return as_datetime(self._last_ping_dt)
 
     def _receive_ping(self, message: dict) -> None:
-        timestamp: str = message.get("timestamp")[:-3]
-        self._last_ping_dt = dt_parse(timestamp)
-
-    def _receive_status(self, message: dict) -> None:
-        self._game.status = extract(message, "status", structs.GameStatus)
-        self._game.current_period = extract(message, "period.current", int)
-        self._game.period_status = extract(
-            message, "period.periodType", structs.PeriodType
-        )
-        self._game.clock = extract(message, "clock")
-        self._game.shot_clock = extract(message, "shotClock")
-        self._game.clock_running = extract(message, "clockRunning", bool)
-        self._game.possession = extract(message, "possession", int)
-        self._game.possession_arrow = extract(message, "possessionArrow", int)
+        self._last_ping_dt = self._parse_time(message.get("timestamp"))
+
+    # Handlers append each field they change to `changes` as they go, so
+    # a handler that fails partway still reports what it already changed.
+    # They return `changes`, or None for messages not tracked field by field.
+
+    def _receive_status(self, message: dict, changes: List[structs.Change]) -> List[structs.Change]:
+        game = self._game
+        for key, value in schema.decode_status(message).items():
+            old = getattr(game, key)
+            if value != old:
+                setattr(game, key, value)
+                changes.append(structs.Change((), key, old, value))
 
         # TODO: Handle `scores` value
+        return changes
 
-    def _receive_setup(self, message: dict) -> None:
-        pass
+    def _replace_game_field(self, key: str, value: Any, changes: List[structs.Change]) -> List[structs.Change]:
+        old = getattr(self._game, key)
+        if value != old:
+            setattr(self._game, key, value)
+            changes.append(structs.Change((), key, old, value))
+        return changes
 
-    def _receive_match_information(self, message: dict) -> None:
-        pass
+    def _receive_setup(self, message: dict, changes: List[structs.Change]) -> List[structs.Change]:
+        return self._replace_game_field("setup", schema.decode_setup(message), changes)
+
+    def _receive_match_information(self, message: dict, changes: List[structs.Change]) -> List[structs.Change]:
+        info = schema.decode_match_information(message)
+        self._game.match_number = info.match_number
+        return self._replace_game_field("match_information", info, changes)
 
     def _parse_players(self, players: list[dict]) -> dict[int, structs.Player]:
-        player_object_map = {}
-        for player in players:
-            player_obj = structs.Player(
-                pno=extract(player, "pno", int),
-                first_name=extract(player, "firstName").strip(),
-                last_name=extract(player, "familyName").strip(),
-                height=extract(player, "height", float),
-                shirt=extract(player, "shirtNumber"),
-                position=extract(player, "playingPosition"),
-                is_starter=extract(player, "starter", bool),
-                is_captain=extract(player, "captain", bool),
-                is_active=extract(player, "active", bool),
-                stats=structs.PlayerStats(),
-            )
-            player_object_map[player_obj.pno] = player_obj
-        return player_object_map
+        decode_player = schema.decode_player
+        return {player.pno: player for player in map(decode_player, players)}
 
-    def _receive_teams(self, message: dict) -> None:
+    def _receive_teams(self, message: dict, changes: List[structs.Change]) -> List[structs.Change]:
         teams = message.get("teams")
         for team in teams:
             players = team.get("players")
-            parsed_players = self._parse_players(players)
-            team_obj = structs.Team(
-                number=extract(team, "teamNumber", int),
-                name=extract(team, "detail.teamName"),
-                code=extract(team, "detail.teamCode"),
-                long_code=extract(team, "detail.teamCodeLong"),
-                is_home=extract(team, "detail.isHomeCompetitor", bool),
-                players=parsed_players,
-                game_stats=structs.TeamStats(),
-            )
-            if team_obj.is_home:
-                self._game.home_team = team_obj
-            else:
-                self._game.away_team = team_obj
+            team_obj = schema.decode_team(team, players=self._parse_players(players))
+            key = "home_team" if team_obj.is_home else "away_team"
+            self._replace_game_field(key, team_obj, changes)
         self._teams_loaded = True
+        return changes
 
-    def _parse_players_boxscore(self, team: structs.Team, players: list[dict]) -> None:
+    def _parse_players_boxscore(
+        self, team: structs.Team, players: list[dict], changes: List[structs.Change]
+    ) -> None:
         for player in players:
             player_num = extract(player, "pno", int)
-            team.players[player_num].stats.update_from_dict(player, strip="s")
+            path = ("teams", team.number, "players", player_num, "stats")
+            team.players[player_num].stats.update_from_dict(player, "s", path, changes)
 
-    def _receive_boxscore(self, message: dict) -> None:
+    def _receive_boxscore(self, message: dict, changes: List[structs.Change]) -> List[structs.Change]:
         teams: list[dict] = message.get("teams")
         for team in teams:
             team_number = team.get("teamNumber")
             team_obj = self._game.get_team_by_number(team_number)
             player_stats = team.get("total").get("players")
-            self._parse_players_boxscore(team_obj, player_stats)
+            self._parse_players_boxscore(team_obj, player_stats, changes)
 
             team_stats = team.get("total").get("team")
-            team_obj.game_stats.update_from_dict(team_stats, strip="s_")
-
-    def _receive_action(self, message: dict) -> None:
-        action = structs.Action(
-            action_number=extract(message, "actionNumber", int),
-            team_number=extract(message, "teamNumber", int),
-            player_number=extract(message, "pno", int),
-            clock=extract(message, "clock"),
-            shot_clock=extract(message, "shotClock"),
-            time_actual=extract(message, "timeActual", dt_parse),
-            period=extract(message, "period", int),
-            period_type=extract(message, "periodType", structs.PeriodType),
-            action_type=extract(message, "actionType", structs.ActionType.from_str),
-            sub_type=extract(message, "subType"),
-            qualifiers=message.get("qualifiers", []),
-            value=extract(message, "value"),
-            previous_action=extract(message, "previousAction", int),
-            x=extract(message, "x", float),
-            y=extract(message, "y", float),
-            area=extract(message, "area"),
-            success=extract(message, "success", bool),
-        )
-
-        message = compose_action_message(action, self._game)
-        self._game.actions.append(action)
-
-        if message != "":
-            print(message)
-
-    def _receive_playbyplay(self, message: dict) -> None:
-        actions = message.get("actions", [])
-        for action in actions:
+            path = ("teams", team_number, "game_stats")
+            team_obj.game_stats.update_from_dict(team_stats, "s_", path, changes)
+        return changes
+
+    def _receive_action(
+        self, message: Union[dict, structs.Action], changes: List[structs.Change]
+    ) -> List[structs.Change]:
+        # Typed decoders hand over an Action already built from the frame.
+        action = message if type(message) is structs.Action else self._decode_action(message)
+
+        previous = self._game.actions.replace(action)
+        if previous is None:
+            self._game.actions.append(action)
+        changes.append(structs.Change(("actions",), action.action_number, previous, action))
+        for observer in self._action_observers:
+            if previous is not None:
+                observer.retract(previous, self._game)
+            observer.apply(action, self._game)
+
+        if self._output is not None:
+            self._output.emit(action, self._game)
+        return changes
+
+    def _receive_playbyplay(self, message: dict, changes: List[structs.Change]) -> None:
+        # The whole history arrives at once on connect: decode it in one
+        # pass into a fresh store, resync observers once and skip the
+        # per-action output. Playbyplay listeners are the single
+        # "history loaded" notification.
+        history = structs.ActionStore()
+        for raw in message.get("actions", []):
             try:
-                self._receive_action(action)
-            except Exception as e:
+                action = raw if type(raw) is structs.Action else self._decode_action(raw)
+            except Exception:
                 logger.error(f"Error handling action in play-by-play.")
                 if self._debug:
-                    logger.error(action)
+                    logger.error(raw)
                     logger.trace(traceback.format_exc())
+                continue
+            if history.replace(action) is None:
+                history.append(action)
+
+        # Live actions received before the burst and not covered by it are kept.
+        history.extend(
+            a for a in self._game.actions
+            if a.action_number and a.action_number not in history.by_number
+        )
+        previous = self._game.actions
+        self._game.actions = history
+        self._reset_observers(previous, self._game)
 
-    def receive(self, message: dict) -> None:
+    def receive(self, message: Union[dict, bytes]) -> Optional[str]:
         """
-        Parse a message from the Genius Sports TV feed as json.
+        Parse a message from the Genius Sports TV feed, either decoded
+        from json or as the raw frame, which is decoded by the parser's
+        `decoder`.
+
+        Returns:
+            Optional[str]: The feed type of the message, None if the frame
+                could not be decoded
         """
-        message_type: str = inflection.underscore(message.get("type"))
-        if message_type != "ping":
-            logger.info(f"Received message type {message_type}")
-        handler_name = f"_receive_{message_type}"
-        handler: Callable = getattr(self, handler_name, None)
+        if isinstance(message, (bytes, bytearray, memoryview)):
+            try:
+                message_type, message = self._decode(message)
+            except Exception:
+                logger.error("Could not decode frame")
+                if self._debug:
+                    logger.error(bytes(message))
+                return None
+        else:
+            message_type = message.get("type")
+        if message_type == "ping":
+            self._message_counts[message_type] += 1
+            try:
+                self._receive_ping(message)
+            except Exception:
+                logger.error("Error handling message type ping")
+            for func in self._listeners.get("ping", ()):
+                func(self._game)
+            return message_type
+
+        try:
+            handler, listener_key = self._dispatch[message_type]
+            self._message_counts[message_type] += 1
+        except KeyError:
+            # Not memoized, and counted together, so a feed sending
+            # arbitrary types cannot grow either table.
+            handler, listener_key = None, inflection.underscore(message_type or "")
+            self._message_counts[UNKNOWN_TYPE] += 1
+
+        changes = None
         if handler:
+            collected = []
             try:
-                handler(message)
+                changes = handler(message, collected)
             except Exception as e:
-                logger.error(f"Error handling message type {message_type}")
+                logger.error(f"Error handling message type {listener_key}")
                 if self._debug:
                     logger.error(message)
                     logger.error(traceback.format_exc())
+                # Fields already updated before the failure are still reported.
+                changes = collected or None
         else:
             logger.error(f"Unknown message type {message_type}")
 
-        listeners = self._listeners[message_type]
-        for func in listeners:
+        if changes is not None:
+            if not changes:
+                return message_type
+            for prefix, func in self._change_listeners:
+                matched = [c for c in changes if c.path[: len(prefix)] == prefix]
+                if matched:
+                    func(matched, self._game)
+
+        for func in self._listeners.get(listener_key, ()):
             func(self._game)
+        return message_type
@@ -0,0 +1,319 @@
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+# Latency buckets in seconds, from 5us to 100ms.
+DEFAULT_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.1,
+)
+
+HISTOGRAMS = {
+    "receive": ("type", "Time spent in receive, by message type"),
+    "decode": ("type", "Time decoding raw frames, by message type"),
+    "handler": ("type", "Time in the message handler, by message type"),
+    "listener": ("listener", "Time calling each listener"),
+}
+
+
+def listener_name(func: Callable) -> str:
+    """Label for a listener: its qualified name, e.g. `LiveStatsApp._on_changes`."""
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, in seconds."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile."""
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class SamplingProfiler:
+    """Samples the ingest thread's stack while it is inside `receive`.
+
+    A background thread wakes every `interval` seconds and, if `receive`
+    is running, records the current call stack. `collapsed()` gives the
+    counts in the collapsed-stack format read by flame graph tools.
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.active_thread: Optional[int] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="receive-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while self._running:
+            time.sleep(self.interval)
+            thread_id = self.active_thread
+            if thread_id is None:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+class Metrics:
+    """Counters, latency histograms and gauges for one `NCAALiveStats`.
+
+    Pass an instance as `NCAALiveStats(metrics=...)`. Without one, `receive`
+    skips every measurement. Read it in-process with `snapshot()` or expose
+    `render_prometheus()` (served at `/metrics` by `LiveStatsApp`).
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        Args:
+            labels (Dict[str, str], optional): Constant labels added to every
+                series, e.g. `{"game": "1234"}` when several parsers share an endpoint.
+            buckets (Tuple[float, ...], optional): Histogram bucket bounds in seconds.
+        """
+        self.labels = dict(labels or {})
+        self.buckets = buckets
+        self.started = time.time()
+        # Replaced by the parser's own `message_counts` counter when attached.
+        self.messages: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.histograms: Dict[str, Dict[str, Histogram]] = {
+            name: defaultdict(self._histogram) for name in HISTOGRAMS
+        }
+        self.gauges: Dict[str, Tuple[str, str, Callable[[], Union[float, Dict[str, float]]]]] = {}
+        self.profiler: Optional[SamplingProfiler] = None
+        self._last_snapshot: Tuple[float, Counter] = (time.monotonic(), Counter())
+
+    def _histogram(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def observe(self, histogram: str, label: str, seconds: float) -> None:
+        self.histograms[histogram][label].observe(seconds)
+
+    # The wrappers below are installed by `NCAALiveStats` only when it has
+    # metrics, so an uninstrumented parser pays nothing for them.
+
+    def timed(self, func: Callable, histogram: str, label: str) -> Callable:
+        """Wrap `func` to record its run time, counting exceptions as errors."""
+        observed = self.histograms[histogram][label]
+        errors = self.errors
+
+        def timed(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            except Exception:
+                errors[label] += 1
+                raise
+            finally:
+                observed.observe(perf_counter() - start)
+
+        return timed
+
+    def timed_decode(self, decode: Callable, known: Set[str]) -> Callable:
+        """Wrap a decoder's `decode` to record decode time by message type.
+        Types not in `known` share the "unknown" label."""
+        histograms = self.histograms["decode"]
+
+        def timed_decode(frame):
+            start = perf_counter()
+            message_type, message = decode(frame)
+            label = message_type if message_type in known else "unknown"
+            histograms[label].observe(perf_counter() - start)
+            return message_type, message
+
+        return timed_decode
+
+    def timed_receive(self, receive: Callable, known: Set[str]) -> Callable:
+        """Wrap `NCAALiveStats.receive` to record the total handling time of
+        each message and to mark it for the sampling profiler. Types not in
+        `known` share the "unknown" label; undecodable frames are counted
+        as errors."""
+        histograms = self.histograms["receive"]
+        errors = self.errors
+
+        def timed_receive(message):
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.active_thread = threading.get_ident()
+            start = perf_counter()
+            try:
+                message_type = receive(message)
+            finally:
+                elapsed = perf_counter() - start
+                if profiler is not None:
+                    profiler.active_thread = None
+            if message_type is None:
+                errors["undecodable"] += 1
+                return None
+            histograms[message_type if message_type in known else "unknown"].observe(elapsed)
+            return message_type
+
+        return timed_receive
+
+    def gauge(
+        self,
+        name: str,
+        func: Callable[[], Union[float, Dict[str, float]]],
+        help: str = "",
+        label: str = "key",
+    ) -> None:
+        """Register a value read at collection time: a number, or a dict
+        of `label` value -> number."""
+        self.gauges[name] = (help, label, func)
+
+    def start_profiler(self, interval: float = 0.001) -> SamplingProfiler:
+        """Start sampling the stack of `receive` calls every `interval` seconds."""
+        if self.profiler is None:
+            self.profiler = SamplingProfiler(interval)
+            self.profiler.start()
+        return self.profiler
+
+    def stop_profiler(self) -> str:
+        """Stop the profiler and return its samples as collapsed stacks."""
+        profiler, self.profiler = self.profiler, None
+        if profiler is None:
+            return ""
+        profiler.stop()
+        return profiler.collapsed()
+
+    def _read_gauges(self) -> Dict[str, Union[float, Dict[str, float]]]:
+        values = {}
+        for name, (_, _, func) in self.gauges.items():
+            try:
+                values[name] = func()
+            except Exception:
+                continue
+        return values
+
+    def snapshot(self) -> dict:
+        """Current counters, latency summaries (seconds) and gauges.
+
+        `rates` are messages per second since the previous snapshot.
+        """
+        now = time.monotonic()
+        last_time, last_counts = self._last_snapshot
+        elapsed = now - last_time
+        rates = {
+            kind: (count - last_counts.get(kind, 0)) / elapsed if elapsed else 0.0
+            for kind, count in self.messages.items()
+        }
+        self._last_snapshot = (now, Counter(self.messages))
+        return {
+            "uptime": time.time() - self.started,
+            "messages": dict(self.messages),
+            "errors": dict(self.errors),
+            "rates": rates,
+            "latency": {
+                name: {label: h.summary() for label, h in histograms.items()}
+                for name, histograms in self.histograms.items()
+            },
+            "gauges": self._read_gauges(),
+        }
+
+    def render_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        return render_prometheus([self])
+
+
+def _labels(constant: Dict[str, str], **extra) -> str:
+    labels = {**constant, **extra}
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus(all_metrics: Iterable[Metrics]) -> str:
+    """Render several `Metrics` (e.g. one per game, told apart by their labels) together."""
+    all_metrics = list(all_metrics)
+    lines = [
+        "# HELP ncaa_messages_total Feed messages received, by type",
+        "# TYPE ncaa_messages_total counter",
+    ]
+    for m in all_metrics:
+        lines += [f"ncaa_messages_total{_labels(m.labels, type=k)} {v}" for k, v in m.messages.items()]
+    lines += [
+        "# HELP ncaa_errors_total Handler (by type) and listener exceptions, and undecodable frames",
+        "# TYPE ncaa_errors_total counter",
+    ]
+    for m in all_metrics:
+        lines += [f"ncaa_errors_total{_labels(m.labels, source=k)} {v}" for k, v in m.errors.items()]
+
+    for name, (label_name, help) in HISTOGRAMS.items():
+        family = f"ncaa_{name}_seconds"
+        lines += [f"# HELP {family} {help}", f"# TYPE {family} histogram"]
+        for m in all_metrics:
+            for label, h in m.histograms[name].items():
+                cumulative = 0
+                for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{family}_bucket{_labels(m.labels, **{label_name: label, 'le': le})} {cumulative}")
+                lines.append(f"{family}_sum{_labels(m.labels, **{label_name: label})} {h.sum}")
+                lines.append(f"{family}_count{_labels(m.labels, **{label_name: label})} {h.count}")
+
+    gauges: Dict[str, list] = defaultdict(list)
+    helps: Dict[str, str] = {}
+    for m in all_metrics:
+        for name, value in m._read_gauges().items():
+            helps[name], label_name, _ = m.gauges[name]
+            family = f"ncaa_{name}"
+            if isinstance(value, dict):
+                gauges[name] += [f"{family}{_labels(m.labels, **{label_name: k})} {v}" for k, v in value.items()]
+            else:
+                gauges[name].append(f"{family}{_labels(m.labels)} {value}")
+    for name, series in gauges.items():
+        lines += [f"# HELP ncaa_{name} {helps[name]}", f"# TYPE ncaa_{name} gauge", *series]
+    return "\n".join(lines) + "\n"
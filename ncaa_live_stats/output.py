@@ -0,0 +1,142 @@
+import atexit
+import queue
+import re
+import sys
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Protocol, TextIO, Tuple, Union
+
+from loguru import logger
+
+from .compose.message import compose_action_message
+from .structs import Action, Game
+
+ANSI_ESCAPE = re.compile(r"\033\[[0-9;]*m")
+_CLOSE = object()
+
+
+def compose(action: Action, game: Game, color: bool = True) -> str:
+    """Compose the play-by-play line for an action, "" if there is none."""
+    try:
+        message = compose_action_message(action, game)
+    except Exception:
+        logger.error(f"Error composing message for action {action.action_number}")
+        return ""
+    return message if color else ANSI_ESCAPE.sub("", message)
+
+
+class OutputSink(Protocol):
+    """Receives every stored action for play-by-play text output.
+
+    `emit` is called on the ingest path, so it should only hand the action
+    off. Composing the text is left to whoever consumes it.
+    """
+
+    def emit(self, action: Action, game: Game) -> None:
+        ...
+
+
+class RingSink:
+    """Keeps the last `maxlen` actions and composes their text on demand."""
+
+    def __init__(self, maxlen: int = 500, color: bool = True) -> None:
+        self.color = color
+        self._actions: Deque[Tuple[Action, Game]] = deque(maxlen=maxlen)
+
+    def emit(self, action: Action, game: Game) -> None:
+        self._actions.append((action, game))
+
+    def messages(self) -> List[str]:
+        """Composed lines for the buffered actions, oldest first."""
+        lines = (compose(action, game, self.color) for action, game in list(self._actions))
+        return [line for line in lines if line]
+
+
+class QueueSink:
+    """Hands actions to another consumer through a bounded queue.
+
+    Works with `queue.Queue` or, when emitting on the loop that consumes
+    it, `asyncio.Queue`. Actions that do not fit are dropped and counted.
+    """
+
+    def __init__(self, target=None, maxsize: int = 1000) -> None:
+        self.queue = target if target is not None else queue.Queue(maxsize)
+        self.dropped = 0
+
+    def emit(self, action: Action, game: Game) -> None:
+        try:
+            self.queue.put_nowait(action)
+        except Exception:
+            # queue.Full and asyncio.QueueFull do not share a base class.
+            self.dropped += 1
+
+    def backlog(self) -> int:
+        """Actions waiting in the queue."""
+        return self.queue.qsize()
+
+
+class WriterSink:
+    """Composes and writes play-by-play lines on a background thread.
+
+    Writes to `stream`, a path (appended to), or stdout by default. When
+    `maxsize` actions are waiting, new ones are dropped and counted rather
+    than slowing ingestion. Lines still queued are written out by `close()`,
+    which also runs at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        stream: Union[TextIO, str, None] = None,
+        color: Optional[bool] = None,
+        maxsize: int = 10000,
+    ) -> None:
+        """
+        Args:
+            stream (TextIO | str, optional): Stream or file path. Defaults to stdout.
+            color (bool, optional): Keep ANSI colors. Defaults to True for
+                streams and False for files.
+            maxsize (int, optional): Actions buffered before dropping. Defaults to 10000.
+        """
+        self._owned = isinstance(stream, str)
+        self.stream = open(stream, "a", encoding="utf-8") if self._owned else stream
+        self.color = color if color is not None else not self._owned
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._thread: Optional[threading.Thread] = None
+
+    def emit(self, action: Action, game: Game) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        try:
+            self._queue.put_nowait((action, game))
+        except queue.Full:
+            self.dropped += 1
+
+    def backlog(self) -> int:
+        """Actions waiting to be written."""
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _CLOSE:
+                return
+            line = compose(*item, self.color)
+            if not line:
+                continue
+            stream = self.stream or sys.stdout
+            stream.write(line + "\n")
+            if self._queue.empty():
+                stream.flush()
+
+    def close(self) -> None:
+        """Write out what is queued and stop the writer thread."""
+        if self._thread is not None:
+            atexit.unregister(self.close)
+            self._queue.put(_CLOSE)
+            self._thread.join()
+            self._thread = None
+        if self._owned:
+            self.stream.close()
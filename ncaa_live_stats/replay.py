@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+from loguru import logger
+
+from .client import DEFAULT_PORT, FEED_TYPE_CODES, FRAME_DELIMITER
+from .main import NCAALiveStats
+from .timestamps import parse_timestamp
+
+
+def iter_recording(path: str) -> Iterator[Tuple[bytes, dict]]:
+    """Lazily read a recorded feed, one JSON message per line.
+
+    Args:
+        path (str): Path to the JSONL recording
+
+    Yields:
+        Tuple[bytes, dict]: The raw frame (without line ending) and its decoded message
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            frame = line.rstrip(b"\r\n")
+            if not frame:
+                continue
+            try:
+                yield frame, json.loads(frame)
+            except ValueError:
+                logger.error(f"Skipping undecodable line in {path}")
+
+
+def message_time(message: dict) -> Optional[datetime]:
+    """Get the feed's own timestamp for a message, if it carries one.
+
+    Pings carry `timestamp`, edited actions carry `edited` and live
+    actions may carry `timeActual`.
+
+    Args:
+        message (dict): Decoded feed message
+
+    Returns:
+        Optional[datetime]: Feed time of the message or None
+    """
+    if message.get("type") == "ping":
+        value = message.get("timestamp")
+    else:
+        value = message.get("edited") or message.get("timeActual")
+    if not value:
+        return None
+    try:
+        return parse_timestamp(value)
+    except (ValueError, OverflowError):
+        return None
+
+
+class _Pacer:
+    """Maps feed timestamps to wall-clock deadlines for a given speed."""
+
+    def __init__(self, speed: Optional[float]) -> None:
+        self.speed = speed
+        self._feed_start: Optional[datetime] = None
+        self._wall_start = 0.0
+        self._feed_now: Optional[datetime] = None
+
+    def delay(self, message: dict) -> float:
+        if not self.speed:
+            return 0.0
+        feed_time = message_time(message)
+        if feed_time is None:
+            return 0.0
+        if self._feed_start is None:
+            self._feed_start = self._feed_now = feed_time
+            self._wall_start = time.monotonic()
+            return 0.0
+        # Feed time never moves backwards, late edits are sent immediately.
+        if feed_time > self._feed_now:
+            self._feed_now = feed_time
+        elapsed = (self._feed_now - self._feed_start).total_seconds() / self.speed
+        return max(0.0, self._wall_start + elapsed - time.monotonic())
+
+
+def paced(path: str, speed: Optional[float] = 1.0) -> Iterator[Tuple[bytes, dict]]:
+    """Iterate a recording, sleeping to reproduce the feed's pacing.
+
+    Args:
+        path (str): Path to the JSONL recording
+        speed (float, optional): Playback rate, 1.0 is real time. None or 0
+            replays as fast as possible. Defaults to 1.0.
+    """
+    pacer = _Pacer(speed)
+    for frame, message in iter_recording(path):
+        delay = pacer.delay(message)
+        if delay:
+            time.sleep(delay)
+        yield frame, message
+
+
+async def apaced(
+    path: str, speed: Optional[float] = 1.0
+) -> AsyncIterator[Tuple[bytes, dict]]:
+    """Async version of `paced`, yielding control to the loop while waiting."""
+    pacer = _Pacer(speed)
+    for frame, message in iter_recording(path):
+        delay = pacer.delay(message)
+        if delay:
+            await asyncio.sleep(delay)
+        yield frame, message
+
+
+def replay(
+    path: str, stats: Optional[NCAALiveStats] = None, speed: Optional[float] = None
+) -> NCAALiveStats:
+    """Push a recording through `NCAALiveStats.receive`.
+
+    Args:
+        path (str): Path to the JSONL recording
+        stats (NCAALiveStats, optional): Parser to feed. A new one is created if omitted.
+        speed (float, optional): Playback rate, None for as fast as possible.
+
+    Returns:
+        NCAALiveStats: The parser after the whole recording was applied.
+            If it was created here, its output has been written out.
+    """
+    owned = stats is None
+    stats = stats if stats is not None else NCAALiveStats()
+    for _, message in paced(path, speed):
+        stats.receive(message)
+    close = getattr(stats.output, "close", None)
+    if owned and close is not None:
+        close()
+    return stats
+
+
+class ReplayServer:
+    """Serves a recording over TCP, speaking the same handshake as the live feed.
+
+    Every connecting client gets its own playback from the start of the
+    recording, filtered to the message types requested in its
+    `parameters` handshake.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        speed: Optional[float] = 1.0,
+    ) -> None:
+        self.path = path
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _read_handshake(self, reader: asyncio.StreamReader) -> dict:
+        buffer = b""
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                raise ConnectionError("Client closed before sending parameters")
+            buffer += chunk
+            try:
+                return json.loads(buffer)
+            except ValueError:
+                continue
+
+    @staticmethod
+    def _allowed_types(params: dict) -> set:
+        codes = params.get("types", "")
+        allowed = {FEED_TYPE_CODES.get(code.strip()) for code in codes.split(",")}
+        if not params.get("playbyplayOnConnect"):
+            allowed.discard("playbyplay")
+        allowed.add("ping")
+        return allowed
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername")
+        try:
+            params = await asyncio.wait_for(self._read_handshake(reader), 10)
+            allowed = self._allowed_types(params)
+            logger.info(f"Replaying {self.path} to {peer}")
+            async for frame, message in apaced(self.path, self.speed):
+                if message.get("type") in allowed:
+                    writer.write(frame + FRAME_DELIMITER)
+                    await writer.drain()
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            logger.warning(f"Replay to {peer} ended: {e!r}")
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        logger.info(f"Replay server listening on {self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded Live Stats feed.")
+    parser.add_argument("path", help="JSONL recording")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="playback rate, 0 for max speed"
+    )
+    parser.add_argument("--serve", action="store_true", help="serve over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    if args.serve:
+        server = ReplayServer(args.path, args.host, args.port, args.speed)
+        asyncio.run(server.serve_forever())
+    else:
+        replay(args.path, speed=args.speed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import sys
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Optional, Sequence
+
+from . import structs
+from .timestamps import parse_feed_time, parse_timestamp
+
+
+@dataclass(frozen=True)
+class Field:
+    """Declares where a decoded attribute comes from in a feed message.
+
+    Args:
+        name (str): Keyword passed to the target constructor
+        path (str, optional): Dot-separated key in the message. If None the
+            value always comes from `default_factory`.
+        cast (Callable, optional): Conversion applied to the raw value. Defaults to str (no conversion).
+        default_factory (Callable, optional): Called when the value is missing.
+    """
+
+    name: str
+    path: Optional[str]
+    cast: Callable = str
+    default_factory: Optional[Callable] = None
+
+
+def compile_decoder(
+    target: Callable, fields: Sequence[Field], attributes: bool = False
+) -> Callable[..., Any]:
+    """Compile a schema into a single-pass decoder function.
+
+    Behaves like calling `extract()` once per field: missing values become
+    None, and a cast raising ValueError falls back to `cast()`. Paths are
+    split and casts bound once here, so decoding a message is a straight
+    run of dict lookups. Keyword arguments given to the decoder are passed
+    through to `target`.
+
+    Args:
+        target (Callable): Class or function building the decoded object
+        fields (Sequence[Field]): Schema
+        attributes (bool, optional): Read each value from the attribute named
+            after the field instead of its path, for messages already decoded
+            into objects (see `decoding`). Defaults to False.
+
+    Returns:
+        Callable[..., Any]: `decode(message, **extra)`
+    """
+    namespace = {"_target": target}
+    lines = ["def decode(m, **extra):"]
+    for i, field in enumerate(fields):
+        var = f"f{i}"
+        if field.path is None:
+            lines.append(f"    {var} = None")
+        elif attributes:
+            lines.append(f"    {var} = m.{field.name}")
+        else:
+            keys = field.path.split(".")
+            lines.append(f"    {var} = m.get({keys[0]!r})")
+            for key in keys[1:]:
+                lines.append(f"    if {var} is not None: {var} = {var}.get({key!r})")
+        if field.path is not None and field.cast is not str:
+            namespace[f"c{i}"] = field.cast
+            lines.append(f"    if {var} is not None:")
+            lines.append(f"        try: {var} = c{i}({var})")
+            lines.append(f"        except ValueError: {var} = c{i}()")
+        if field.default_factory is not None:
+            namespace[f"d{i}"] = field.default_factory
+            lines.append(f"    if {var} is None: {var} = d{i}()")
+    arguments = ", ".join(f"{field.name}=f{i}" for i, field in enumerate(fields))
+    lines.append(f"    return _target({arguments}, **extra)")
+    exec("\n".join(lines), namespace)
+    return namespace["decode"]
+
+
+def intern_all(values: list) -> list:
+    return [sys.intern(v) for v in values]
+
+
+# Strings that repeat across actions (clocks, sub types, areas, qualifiers)
+# are interned so a game holds one copy of each.
+ACTION = [
+    Field("action_number", "actionNumber", int),
+    Field("team_number", "teamNumber", int),
+    Field("player_number", "pno", int),
+    Field("clock", "clock", sys.intern),
+    Field("shot_clock", "shotClock", sys.intern),
+    Field("time_actual", "timeActual", parse_timestamp),
+    Field("period", "period", int),
+    Field("period_type", "periodType", structs.PeriodType),
+    Field("action_type", "actionType", structs.ActionType.from_str),
+    Field("sub_type", "subType", sys.intern),
+    Field("qualifiers", "qualifiers", intern_all, default_factory=list),
+    Field("value", "value"),
+    Field("previous_action", "previousAction", int),
+    Field("x", "x", float),
+    Field("y", "y", float),
+    Field("area", "area", sys.intern),
+    Field("success", "success", bool),
+    Field("message_id", "messageId", int),
+    Field("orig_message_id", "origMessageId", int),
+    Field("edited", "edited", parse_timestamp),
+    Field("score1", "score1", int),
+    Field("score2", "score2", int),
+]
+
+PLAYER = [
+    Field("pno", "pno", int),
+    Field("first_name", "firstName", str.strip),
+    Field("last_name", "familyName", str.strip),
+    Field("height", "height", float),
+    Field("shirt", "shirtNumber"),
+    Field("position", "playingPosition", sys.intern),
+    Field("is_starter", "starter", bool),
+    Field("is_captain", "captain", bool),
+    Field("is_active", "active", bool),
+    Field("stats", None, default_factory=structs.PlayerStats),
+]
+
+TEAM = [
+    Field("number", "teamNumber", int),
+    Field("name", "detail.teamName"),
+    Field("code", "detail.teamCode"),
+    Field("long_code", "detail.teamCodeLong"),
+    Field("is_home", "detail.isHomeCompetitor", bool),
+    Field("game_stats", None, default_factory=structs.TeamStats),
+]
+
+STATUS = [
+    Field("status", "status", structs.GameStatus),
+    Field("current_period", "period.current", int),
+    Field("period_type", "period.periodType", structs.PeriodType),
+    Field("period_status", "period.periodStatus", structs.PeriodStatus),
+    Field("clock", "clock"),
+    Field("shot_clock", "shotClock"),
+    Field("clock_running", "clockRunning", bool),
+    Field("possession", "possession", int),
+    Field("possession_arrow", "possessionArrow", int),
+]
+
+SETUP = [
+    Field("fouls_personal", "foulsPersonal", int),
+    Field("fouls_technical", "foulsTechnical", int),
+    Field("fouls_before_bonus", "foulsBeforeBonus", int),
+    Field("max_fouls_personal", "maxFoulsPersonal", int),
+    Field("max_fouls_technical", "maxFoulsTechnical", int),
+    Field("periods", "periods.number", int),
+    Field("period_length", "periods.length", int),
+    Field("extra_time_length", "periods.extraTimeLength", int),
+    Field("timeouts_style", "timeouts.timeoutsStyle"),
+]
+
+MATCH_INFORMATION = [
+    Field("match_number", "match.matchNumber", int),
+    Field("match_name", "match.matchName"),
+    Field("match_time", "match.matchTime"),
+    Field("round_description", "match.roundDescription"),
+    Field("in_conference", "match.inConference", bool),
+    Field("competition_name", "competition.competitionName"),
+    Field("venue_name", "venue.venueName"),
+    Field("is_neutral_venue", "venue.isNeutralVenue", bool),
+]
+
+# Timestamps kept as `FeedTime` epoch numbers instead of datetimes.
+ACTION_FEED_TIMES = [
+    replace(field, cast=parse_feed_time) if field.cast is parse_timestamp else field
+    for field in ACTION
+]
+
+decode_action = compile_decoder(structs.Action, ACTION)
+decode_action_feed_times = compile_decoder(structs.Action, ACTION_FEED_TIMES)
+decode_player = compile_decoder(structs.Player, PLAYER)
+decode_team = compile_decoder(structs.Team, TEAM)
+decode_status = compile_decoder(dict, STATUS)
+decode_setup = compile_decoder(structs.Setup, SETUP)
+decode_match_information = compile_decoder(structs.MatchInformation, MATCH_INFORMATION)
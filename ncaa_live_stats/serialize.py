@@ -0,0 +1,261 @@
+import json
+from dataclasses import asdict, fields
+from datetime import datetime
+from enum import Enum
+from operator import attrgetter
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import structs
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+TEAM_KEYS = ("home_team", "away_team")
+# Game fields encoded together as the snapshot header.
+HEADER_FIELDS = [
+    f.name for f in fields(structs.Game) if f.name not in ("actions", "derived") + TEAM_KEYS
+]
+TEAM_HEADER_FIELDS = [f.name for f in fields(structs.Team) if f.name not in ("players", "game_stats")]
+
+
+_FIELD_GETTERS: Dict[type, tuple] = {}
+
+
+def _fields_dict(obj) -> dict:
+    """A dataclass's fields as a shallow dict. Nested dataclasses are left
+    for `_default`, so nothing is deep-copied as with `asdict`."""
+    cls = type(obj)
+    getter = _FIELD_GETTERS.get(cls)
+    if getter is None:
+        names = tuple(f.name for f in fields(cls))
+        # attrgetter with one name returns the value rather than a tuple.
+        getter = _FIELD_GETTERS[cls] = (names, attrgetter(*names) if len(names) > 1 else None)
+    names, get = getter
+    if get is None:
+        return {name: getattr(obj, name) for name in names}
+    return dict(zip(names, get(obj)))
+
+
+def _default(value):
+    if hasattr(value, "__dataclass_fields__"):
+        return _fields_dict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, float):
+        # `FeedTime`, which orjson does not take as a float.
+        return float(value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+_ENCODER = json.JSONEncoder(default=_default, separators=(",", ":"))
+if orjson is not None:
+    # Dataclasses and datetimes still go through `_default`, so the output
+    # has the same fields and timestamps as the json path.
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def encode(value) -> bytes:
+    """Compact JSON encoding of primitives, enums, datetimes and dataclasses.
+
+    Uses orjson when it is installed (the `fast` extra), json otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+    return _ENCODER.encode(value).encode("utf-8")
+
+
+def _plain(value):
+    return asdict(value) if hasattr(value, "__dataclass_fields__") else value
+
+
+def encode_dataclass(obj) -> bytes:
+    """Encode a dataclass as `asdict` followed by `encode` would."""
+    return encode(obj)
+
+
+class _TeamCache:
+    def __init__(self) -> None:
+        self.team: Optional[structs.Team] = None
+        self.header: Optional[bytes] = None
+        self.stats: Optional[bytes] = None
+        self.players: Dict[int, bytes] = {}
+        self.encoded: Optional[bytes] = None
+
+
+class GameSerializer:
+    """Keeps an encoded JSON snapshot of a `Game` current with minimal work.
+
+    Each team header, player, team stat block, action and the game header
+    is cached as encoded JSON. Change sets from `NCAALiveStats` mark the
+    affected pieces dirty. A snapshot re-encodes only those pieces and the
+    actions appended since the previous call, then splices the cached
+    bytes together. With nothing changed, the previous snapshot is returned.
+    """
+
+    def __init__(self, stats) -> None:
+        self._stats = stats
+        self._teams = {key: _TeamCache() for key in TEAM_KEYS}
+        self._header: Optional[bytes] = None
+        self._derived: Optional[bytes] = None
+        self._actions: List[bytes] = []
+        self._actions_joined = bytearray()
+        self._actions_encoded: Optional[bytes] = None
+        self._actions_source: Optional[structs.ActionStore] = None
+        self._corrected: Set[int] = set()
+        self._snapshot: Optional[bytes] = None
+        # The objects the cached header, derived block and snapshot were
+        # encoded from, so replacements are caught whatever order the
+        # change listeners run in.
+        self._header_source: Optional[structs.Game] = None
+        self._derived_source: Optional[Tuple[int, int]] = None
+        self._snapshot_sources: tuple = ()
+        stats.add_change_listener(self._on_changes, inline=True)
+        stats.add_listener("playbyplay", lambda game: self.invalidate(), inline=True)
+
+    def invalidate(self) -> None:
+        """Drop every cached fragment."""
+        for cache in self._teams.values():
+            cache.team = None
+        self._header = self._derived = None
+        self._actions_source = None
+        self._snapshot = None
+
+    def _team_cache(self, team_number: int) -> Optional[_TeamCache]:
+        for cache in self._teams.values():
+            if cache.team is not None and cache.team.number == team_number:
+                return cache
+        return None
+
+    def _on_changes(self, changes: List[structs.Change], game: structs.Game) -> None:
+        self._snapshot = None
+        team_caches = {}
+        for change in changes:
+            path = change.path
+            if not path:
+                if change.field in TEAM_KEYS:
+                    self._teams[change.field].team = None
+                else:
+                    self._header = None
+            elif path[0] == "actions":
+                self._derived = None
+                if change.old is not None:
+                    self._corrected.add(change.field)
+            elif path[0] == "teams":
+                team_number = path[1]
+                if team_number not in team_caches:
+                    team_caches[team_number] = self._team_cache(team_number)
+                cache = team_caches[team_number]
+                if cache is None:
+                    continue
+                cache.encoded = None
+                if path[2] == "players":
+                    cache.players.pop(path[3], None)
+                else:
+                    cache.stats = None
+
+    def _encode_team(self, key: str, team: Optional[structs.Team]) -> bytes:
+        cache = self._teams[key]
+        if team is None:
+            return b"null"
+        if cache.team is not team:
+            # A new `teams` message replaced the roster.
+            cache.team = team
+            cache.header = cache.stats = cache.encoded = None
+            cache.players = {}
+        if cache.encoded is not None:
+            return cache.encoded
+        if cache.header is None:
+            cache.header = encode({name: _plain(getattr(team, name)) for name in TEAM_HEADER_FIELDS})
+        if cache.stats is None:
+            cache.stats = encode_dataclass(team.game_stats)
+        players = []
+        for pno, player in (team.players or {}).items():
+            fragment = cache.players.get(pno)
+            if fragment is None:
+                fragment = cache.players[pno] = encode_dataclass(player)
+            players.append(b'"%d":%s' % (pno, fragment))
+        cache.encoded = b"".join(
+            (
+                cache.header[:-1],
+                b',"players":{',
+                b",".join(players),
+                b'},"game_stats":',
+                cache.stats,
+                b"}",
+            )
+        )
+        return cache.encoded
+
+    def _encode_actions(self, actions: structs.ActionStore) -> bytes:
+        if self._actions_source is not actions or len(self._actions) > len(actions):
+            self._actions_source = actions
+            self._actions = []
+            self._actions_joined = bytearray()
+            self._actions_encoded = None
+            self._corrected.clear()
+        if self._corrected:
+            for action_number in self._corrected:
+                action = actions.by_number.get(action_number)
+                position = structs.ActionStore._position(actions, action) if action else None
+                if position is not None and position < len(self._actions):
+                    self._actions[position] = encode_dataclass(action)
+            self._corrected.clear()
+            self._actions_joined = bytearray(b",".join(self._actions))
+            self._actions_encoded = None
+        if len(self._actions) < len(actions):
+            self._actions_encoded = None
+        for action in actions[len(self._actions):]:
+            fragment = encode_dataclass(action)
+            if self._actions:
+                self._actions_joined += b","
+            self._actions_joined += fragment
+            self._actions.append(fragment)
+        if self._actions_encoded is None:
+            self._actions_encoded = b"[" + self._actions_joined + b"]"
+        return self._actions_encoded
+
+    def actions(self) -> bytes:
+        """The play-by-play as a JSON array."""
+        return self._encode_actions(self._stats.game.actions)
+
+    def snapshot(self) -> bytes:
+        """The whole game as a JSON object, shaped like `dataclasses.asdict(game)`."""
+        game = self._stats.game
+        sources = (game, game.actions, game.home_team, game.away_team, game.derived)
+        if (
+            self._snapshot is not None
+            and all(a is b for a, b in zip(sources, self._snapshot_sources))
+            and len(self._actions) == len(game.actions)
+        ):
+            return self._snapshot
+        if self._header is None or self._header_source is not game:
+            self._header_source = game
+            self._header = encode(
+                {name: _plain(getattr(game, name)) for name in HEADER_FIELDS}
+            )
+        # `derived` is updated in place as actions are applied. The id is
+        # safe to compare: `_snapshot_sources` keeps the object alive.
+        derived_source = (id(game.derived), len(game.actions))
+        if self._derived is None or self._derived_source != derived_source:
+            self._derived_source = derived_source
+            self._derived = encode_dataclass(game.derived)
+        self._snapshot = b"".join(
+            (
+                b'{"actions":',
+                self._encode_actions(game.actions),
+                b',"home_team":',
+                self._encode_team("home_team", game.home_team),
+                b',"away_team":',
+                self._encode_team("away_team", game.away_team),
+                b',"derived":',
+                self._derived,
+                b",",
+                self._header[1:],
+            )
+        )
+        self._snapshot_sources = sources
+        return self._snapshot
@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+from typing import List, NamedTuple, Optional, Set
+
+from loguru import logger
+
+from . import structs
+from .client import DEFAULT_PORT, FeedClient
+from .main import NCAALiveStats
+from .metrics import Metrics
+from .serialize import TEAM_KEYS, _plain, encode
+
+_RESYNC = object()
+
+
+class Update(NamedTuple):
+    """One broadcast update, encoded once for every transport."""
+
+    text: str
+    sse: bytes
+
+    @classmethod
+    def from_json(cls, payload: bytes) -> "Update":
+        return cls(payload.decode("utf-8"), b"data: " + payload + b"\n\n")
+
+
+class Subscriber:
+    """A connected client's bounded queue of pending updates.
+
+    When a client falls `max_queue` updates behind, its backlog is thrown
+    away and it is sent a fresh snapshot instead, so a slow client never
+    holds up ingestion or the other clients.
+    """
+
+    def __init__(self, max_queue: int) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = 0
+
+    def offer(self, update: Update) -> None:
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+
+
+class Broadcaster:
+    """Fans updates out to every subscriber without waiting on any of them.
+
+    `publish` must be called from the event loop the subscribers run on.
+    """
+
+    def __init__(self, max_queue: int = 256) -> None:
+        self.max_queue = max_queue
+        self.subscribers: Set[Subscriber] = set()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, update: Update) -> None:
+        for subscriber in self.subscribers:
+            subscriber.offer(update)
+
+
+def encode_changes(changes: List[structs.Change], game: Optional[structs.Game] = None) -> bytes:
+    """Encode a change set as a `changes` update.
+
+    `Game.derived` is updated in place as actions arrive, so it never has
+    changes of its own. With `game`, the whole `derived` block is sent as
+    a game field change after any action change.
+    """
+    if game is not None and any(c.path[:1] == ("actions",) for c in changes):
+        changes = [*changes, structs.Change((), "derived", None, game.derived)]
+    return encode(
+        {
+            "type": "changes",
+            "changes": [
+                {"path": c.path, "field": c.field, "value": _plain(c.new)} for c in changes
+            ],
+        }
+    )
+
+
+class LiveStatsApp:
+    """ASGI app serving a live `NCAALiveStats` game to graphics clients.
+
+    Routes:
+        GET /game: The current game as JSON
+        GET /actions: The play-by-play as JSON
+        GET /events: Server-sent events, a `snapshot` then `changes` updates
+        WebSocket /ws: The same updates as text messages
+        GET /metrics: Prometheus metrics, if `stats` was created with `Metrics`
+
+    Every update is encoded once and the same bytes are queued for each
+    client. Run it with any ASGI server, on the loop that feeds `stats`.
+    """
+
+    def __init__(self, stats: NCAALiveStats, max_queue: int = 256) -> None:
+        self.stats = stats
+        self.broadcaster = Broadcaster(max_queue)
+        # Builds the serializer first, so its listeners drop stale fragments
+        # before ours publish.
+        stats.as_json()
+        stats.add_change_listener(self._on_changes, inline=True)
+        stats.add_listener("playbyplay", lambda game: self._publish_snapshot(), inline=True)
+        if stats.metrics is not None:
+            subscribers = self.broadcaster.subscribers
+            stats.metrics.gauge("subscribers", lambda: len(subscribers), "Connected clients")
+            stats.metrics.gauge(
+                "subscriber_queue_depth_max",
+                lambda: max((s.queue.qsize() for s in subscribers), default=0),
+                "Longest client backlog",
+            )
+
+    def snapshot(self) -> Update:
+        return Update.from_json(b'{"type":"snapshot","game":' + self.stats.as_json() + b"}")
+
+    def _publish_snapshot(self) -> None:
+        if self.broadcaster.subscribers:
+            self.broadcaster.publish(self.snapshot())
+
+    def _on_changes(self, changes: List[structs.Change], game: structs.Game) -> None:
+        if not self.broadcaster.subscribers:
+            return
+        if any(not c.path and c.field in TEAM_KEYS for c in changes):
+            # A new roster is easier to take whole than as a diff.
+            self._publish_snapshot()
+        else:
+            self.broadcaster.publish(Update.from_json(encode_changes(changes, game)))
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+    async def _next(self, subscriber: Subscriber) -> Update:
+        update = await subscriber.queue.get()
+        if update is _RESYNC:
+            logger.warning(f"Client fell behind, {subscriber.dropped} updates dropped so far")
+            return self.snapshot()
+        return update
+
+    async def _stream(self, receive, push, closed: Set[str]) -> None:
+        """Push updates until the client sends one of the `closed` message types."""
+        subscriber = self.broadcaster.subscribe()
+        disconnect = asyncio.ensure_future(self._wait_for(receive, closed))
+        try:
+            await push(self.snapshot())
+            while True:
+                pending = asyncio.ensure_future(self._next(subscriber))
+                await asyncio.wait((pending, disconnect), return_when=asyncio.FIRST_COMPLETED)
+                if disconnect.done():
+                    pending.cancel()
+                    return
+                await push(pending.result())
+        finally:
+            self.broadcaster.unsubscribe(subscriber)
+            disconnect.cancel()
+
+    @staticmethod
+    async def _wait_for(receive, types: Set[str]) -> None:
+        while (await receive())["type"] not in types:
+            pass
+
+    async def _http(self, scope: dict, receive, send) -> None:
+        path = scope["path"].rstrip("/")
+        if scope["method"] != "GET":
+            return await self._respond(send, 405, b"Method Not Allowed", b"text/plain")
+        if path in ("", "/game"):
+            return await self._respond(send, 200, self.stats.as_json())
+        if path == "/actions":
+            return await self._respond(send, 200, self.stats.as_json("actions"))
+        if path == "/metrics" and self.stats.metrics is not None:
+            body = self.stats.metrics.render_prometheus().encode("utf-8")
+            return await self._respond(send, 200, body, b"text/plain; version=0.0.4")
+        if path != "/events":
+            return await self._respond(send, 404, b"Not Found", b"text/plain")
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                ],
+            }
+        )
+
+        async def push(update: Update) -> None:
+            await send({"type": "http.response.body", "body": update.sse, "more_body": True})
+
+        await self._stream(receive, push, {"http.disconnect"})
+
+    @staticmethod
+    async def _respond(send, status: int, body: bytes, content_type: bytes = b"application/json") -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", content_type)],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _websocket(self, scope: dict, receive, send) -> None:
+        if (await receive())["type"] != "websocket.connect":
+            return
+        if scope["path"].rstrip("/") != "/ws":
+            return await send({"type": "websocket.close", "code": 1008})
+        await send({"type": "websocket.accept"})
+
+        async def push(update: Update) -> None:
+            await send({"type": "websocket.send", "text": update.text})
+
+        await self._stream(receive, push, {"websocket.disconnect"})
+
+
+async def serve(
+    feed_host: str,
+    feed_port: int = DEFAULT_PORT,
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    stats: Optional[NCAALiveStats] = None,
+    max_queue: int = 256,
+    metrics: bool = False,
+    **client_kwargs,
+) -> None:
+    """Follow a feed and serve it with `LiveStatsApp` on one event loop.
+
+    Args:
+        feed_host (str): Host running the Live Stats TV feed
+        feed_port (int, optional): Port of the TV feed. Defaults to DEFAULT_PORT.
+        host (str, optional): Interface to serve HTTP on. Defaults to "0.0.0.0".
+        port (int, optional): HTTP port. Defaults to 8000.
+        stats (NCAALiveStats, optional): Parser to feed. A new one is created if omitted.
+        max_queue (int, optional): Updates buffered per client. Defaults to 256.
+        metrics (bool, optional): Create `stats` with `Metrics`, served at `/metrics`.
+    """
+    import uvicorn
+
+    stats = stats if stats is not None else NCAALiveStats(metrics=Metrics() if metrics else None)
+    app = LiveStatsApp(stats, max_queue)
+    client = FeedClient(feed_host, feed_port, stats=stats, **client_kwargs)
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    feed = asyncio.ensure_future(client.run())
+    try:
+        await server.serve()
+    finally:
+        client.stop()
+        await feed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a Live Stats feed over HTTP and WebSocket.")
+    parser.add_argument("feed_host", help="host running the Live Stats TV feed")
+    parser.add_argument("--feed-port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--metrics", action="store_true", help="serve Prometheus metrics at /metrics")
+    args = parser.parse_args()
+    asyncio.run(
+        serve(
+            args.feed_host,
+            args.feed_port,
+            args.host,
+            args.port,
+            max_queue=args.max_queue,
+            metrics=args.metrics,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-from dataclasses import dataclass
+from bisect import insort
+from dataclasses import dataclass, field, replace
+from operator import attrgetter
 from enum import Enum, auto
-from typing import Literal, Optional
+from typing import Any, Callable, Iterable, Literal, NamedTuple, Optional
 import inflection
 from loguru import logger
 from datetime import datetime
-from first import first
 
 
 PERIOD_EXPAND = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th"}
@@ -15,7 +16,22 @@ class AutoEnum(Enum):
         return name
 
 
+class Change(NamedTuple):
+    """A single field update. `path` locates the entity, e.g.
+    `("teams", 1, "players", 5, "stats")`, and is empty for `Game` itself."""
+
+    path: tuple
+    field: str
+    old: Any
+    new: Any
+
+
 class FromDictMixin:
+    __slots__ = ()
+
+    # (class, strip) -> {feed key: (field name, cast) or None for unknown keys}
+    _field_maps: dict[tuple[type, str], dict[str, Optional[tuple[str, Callable]]]] = {}
+
     @classmethod
     def from_dict(cls, message: dict):
         renamed_dict = {
@@ -23,20 +39,56 @@ class FromDictMixin:
         }
         return cls(**renamed_dict)
 
-    def update_from_dict(self, message: dict, strip: str = ""):
-        annotations = self.__annotations__
+    @classmethod
+    def _compile_field(cls, key: str, strip: str) -> Optional[tuple[str, Callable]]:
+        normal_key = inflection.underscore(key.lstrip(strip))
+        cast_type = cls.__annotations__.get(normal_key)
+        if cast_type is None:
+            logger.debug(f"Unknown field {normal_key} found on {cls}")
+            return None
+        return normal_key, cast_type
+
+    def update_from_dict(
+        self,
+        message: dict,
+        strip: str = "",
+        path: tuple = (),
+        changes: Optional[list["Change"]] = None,
+    ) -> list["Change"]:
+        """Update fields from a feed mapping with camelCase keys.
+
+        Key translation is resolved once per class and `strip` prefix and
+        cached, unknown keys are remembered and skipped from then on.
+
+        Returns:
+            list[Change]: Fields that changed, tagged with `path`. Appended
+                to `changes` if given.
+        """
+        if changes is None:
+            changes = []
+        cls = self.__class__
+        field_map = FromDictMixin._field_maps.get((cls, strip))
+        if field_map is None:
+            field_map = FromDictMixin._field_maps[(cls, strip)] = {}
         for key, value in message.items():
-            normal_key = inflection.underscore(key.lstrip(strip))
-            cast_type = annotations.get(normal_key)
-            if cast_type is not None:
-                cast_value = cast_type(value)
-                if cast_value != getattr(self, normal_key):
-                    setattr(self, normal_key, cast_value)
-            else:
-                logger.debug(f"Unknown field {normal_key} found on {self.__class__}")
+            try:
+                entry = field_map[key]
+            except KeyError:
+                entry = field_map[key] = cls._compile_field(key, strip)
+            if entry is None:
+                continue
+            normal_key, cast_type = entry
+            cast_value = cast_type(value)
+            old_value = getattr(self, normal_key)
+            if cast_value != old_value:
+                setattr(self, normal_key, cast_value)
+                changes.append(Change(path, normal_key, old_value, cast_value))
+        return changes
 
 
 class StatsMixin:
+    __slots__ = ()
+
     @property
     def field_goals_fraction(self) -> str:
         return f"{self.field_goals_made}/{self.field_goals_attempted}"
@@ -50,7 +102,7 @@ class StatsMixin:
         return f"{self.free_throws_made}/{self.free_throws_attempted}"
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerStats(FromDictMixin, StatsMixin):
     assists: int = 0
     blocks_received: int = 0
@@ -95,7 +147,7 @@ class PlayerStats(FromDictMixin, StatsMixin):
     two_pointers_percentage: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class TeamStats(FromDictMixin, StatsMixin):
     assists: int = 0
     bench_points: int = 0
@@ -154,7 +206,7 @@ class TeamScore:
     team_fouls: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     pno: int
     first_name: str
@@ -184,8 +236,16 @@ class Team:
     period_stats: dict[int, TeamStats] = None
     score: TeamScore = None
 
+    def __post_init__(self):
+        self._shirt_index: Optional[dict[str, Player]] = None
+        self._shirt_index_players = None
+
     def get_player_by_shirt(self, num: int) -> Player:
-        return first(self.players.values(), key=lambda p: p.shirt == num)
+        # Rebuilt whenever the roster dict is replaced.
+        if self._shirt_index is None or self._shirt_index_players is not self.players:
+            self._shirt_index = {str(p.shirt): p for p in (self.players or {}).values()}
+            self._shirt_index_players = self.players
+        return self._shirt_index.get(str(num))
 
 
 class GameStatus(AutoEnum):
@@ -243,7 +303,7 @@ class ActionType(AutoEnum):
         return cls[value]
 
 
-@dataclass
+@dataclass(slots=True)
 class Action:
     action_number: int
     team_number: int
@@ -262,6 +322,11 @@ class Action:
     area: str
     success: bool
     previous_action: Optional[int] = None
+    message_id: Optional[int] = None
+    orig_message_id: Optional[int] = None
+    edited: Optional[datetime] = None
+    score1: Optional[int] = None
+    score2: Optional[int] = None
 
     @property
     def clock_norm(self) -> str:
@@ -291,6 +356,188 @@ class Action:
         return game.get_team_by_number(self.team_number)
 
 
+class ActionStore(list):
+    """List of actions that maintains lookup indexes as actions are appended.
+
+    Indexes are kept by action number, team, (team, player), action type
+    and (period type, period). Only `append`, `extend`, `replace` and
+    `clear` keep them in sync, other list mutators should not be used.
+    """
+
+    def __init__(self, actions: Iterable["Action"] = ()):
+        super().__init__()
+        self._reset_indexes()
+        self.extend(actions)
+
+    def _reset_indexes(self) -> None:
+        self.edit_chains: dict[int, list[Optional[int]]] = {}
+        self.by_number: dict[int, Action] = {}
+        self.by_team: dict[int, list[Action]] = {}
+        self.by_player: dict[tuple[int, int], list[Action]] = {}
+        self.by_type: dict[ActionType, list[Action]] = {}
+        self.by_period: dict[tuple[PeriodType, int], list[Action]] = {}
+
+    def _index(self, action: "Action") -> None:
+        # asdict() rebuilds the store from plain dicts, which are not indexed.
+        if not isinstance(action, Action):
+            return
+        if action.action_number:
+            self.by_number[action.action_number] = action
+        if action.team_number is not None:
+            self.by_team.setdefault(action.team_number, []).append(action)
+            if action.player_number is not None:
+                key = (action.team_number, action.player_number)
+                self.by_player.setdefault(key, []).append(action)
+        self.by_type.setdefault(action.action_type, []).append(action)
+        self.by_period.setdefault((action.period_type, action.period), []).append(action)
+
+    def append(self, action: "Action") -> None:
+        super().append(action)
+        self._index(action)
+
+    def extend(self, actions: Iterable["Action"]) -> None:
+        for action in actions:
+            self.append(action)
+
+    def clear(self) -> None:
+        super().clear()
+        self._reset_indexes()
+
+    @staticmethod
+    def _position(actions: list["Action"], action: "Action") -> int:
+        # Corrections almost always target recent actions, so search from the end.
+        for i in range(len(actions) - 1, -1, -1):
+            if actions[i] is action:
+                return i
+        raise ValueError(f"{action!r} is not stored")
+
+    @classmethod
+    def _reindex(cls, index: dict, old_key, new_key, old: "Action", new: "Action") -> None:
+        if old_key is not None and old_key == new_key:
+            bucket = index[old_key]
+            bucket[cls._position(bucket, old)] = new
+            return
+        if old_key is not None:
+            bucket = index[old_key]
+            del bucket[cls._position(bucket, old)]
+            if not bucket:
+                del index[old_key]
+        if new_key is not None:
+            insort(index.setdefault(new_key, []), new, key=attrgetter("action_number"))
+
+    def replace(self, action: "Action") -> Optional["Action"]:
+        """Swap in a new revision of an already stored action.
+
+        The revision takes the old one's place in the list and in every
+        index, and its message id is added to `edit_chains`.
+
+        Args:
+            action (Action): New revision, matched on `action_number`
+
+        Returns:
+            Optional[Action]: The replaced revision, or None if the action
+                number was not stored (nothing is changed in that case)
+        """
+        old = self.by_number.get(action.action_number) if action.action_number else None
+        if old is None:
+            return None
+        super().__setitem__(self._position(self, old), action)
+        self.by_number[action.action_number] = action
+        self._reindex(self.by_team, old.team_number, action.team_number, old, action)
+        old_player = (old.team_number, old.player_number)
+        new_player = (action.team_number, action.player_number)
+        self._reindex(
+            self.by_player,
+            None if None in old_player else old_player,
+            None if None in new_player else new_player,
+            old,
+            action,
+        )
+        self._reindex(self.by_type, old.action_type, action.action_type, old, action)
+        self._reindex(
+            self.by_period,
+            (old.period_type, old.period),
+            (action.period_type, action.period),
+            old,
+            action,
+        )
+        chain = self.edit_chains.setdefault(action.action_number, [old.message_id])
+        chain.append(action.message_id)
+        return old
+
+    def __reduce__(self):
+        # The indexes are rebuilt from the actions; the correction history
+        # cannot be, so it is carried as state.
+        return (self.__class__, (list(self),), {"edit_chains": self.edit_chains})
+
+
+@dataclass
+class Setup:
+    fouls_personal: int = None
+    fouls_technical: int = None
+    fouls_before_bonus: int = None
+    max_fouls_personal: int = None
+    max_fouls_technical: int = None
+    periods: int = None
+    period_length: int = None
+    extra_time_length: int = None
+    timeouts_style: str = None
+
+
+@dataclass
+class MatchInformation:
+    match_number: int = None
+    match_name: str = None
+    match_time: str = None
+    round_description: str = None
+    in_conference: bool = None
+    competition_name: str = None
+    venue_name: str = None
+    is_neutral_venue: bool = None
+
+
+@dataclass
+class DerivedStats:
+    """Game flow aggregates maintained action by action.
+
+    Times are elapsed game seconds. Dicts are keyed by team number.
+    """
+
+    score1: int = 0
+    score2: int = 0
+    leader: int = 0
+    lead_changes: int = 0
+    times_tied: int = 0
+    largest_lead: dict[int, int] = field(default_factory=dict)
+    run_team: Optional[int] = None
+    run_points: int = 0
+    longest_run: dict[int, int] = field(default_factory=dict)
+    last_score: dict[int, float] = field(default_factory=dict)
+    last_field_goal: dict[int, float] = field(default_factory=dict)
+    last_elapsed: Optional[float] = None
+
+    def copy(self) -> "DerivedStats":
+        return replace(
+            self,
+            largest_lead=dict(self.largest_lead),
+            longest_run=dict(self.longest_run),
+            last_score=dict(self.last_score),
+            last_field_goal=dict(self.last_field_goal),
+        )
+
+    def scoring_drought(self, team_number: int) -> Optional[float]:
+        """Seconds of game time since `team_number` last scored, as of the latest action."""
+        if self.last_elapsed is None:
+            return None
+        return self.last_elapsed - self.last_score.get(team_number, 0.0)
+
+    def time_since_field_goal(self, team_number: int) -> Optional[float]:
+        """Seconds of game time since `team_number` last made a field goal."""
+        if self.last_elapsed is None:
+            return None
+        return self.last_elapsed - self.last_field_goal.get(team_number, 0.0)
+
+
 @dataclass()
 class Game:
     actions: list[Action]
@@ -298,16 +545,61 @@ class Game:
     away_team: Team = None
     status: GameStatus = None
     current_period: int = None
-    period_type: int = None
+    period_type: PeriodType = None
     period_status: PeriodStatus = None
     clock: str = None
     shot_clock: str = None
     clock_running: bool = None
     possession: Literal[0, 1, 2] = None
     possession_arrow: Literal[0, 1, 2] = None
+    match_number: int = None
+    setup: Setup = None
+    match_information: MatchInformation = None
+    derived: DerivedStats = field(default_factory=DerivedStats)
+
+    def __post_init__(self):
+        if not isinstance(self.actions, ActionStore):
+            self.actions = ActionStore(self.actions or [])
 
     def get_team_by_number(self, number: int) -> "Team":
         if self.home_team.number == number:
             return self.home_team
         elif self.away_team.number == number:
             return self.away_team
+
+    def get_action_by_number(self, action_number: int) -> Optional[Action]:
+        return self.actions.by_number.get(action_number)
+
+    def get_actions_by_team(
+        self, team_number: int, action_type: Optional[ActionType] = None
+    ) -> list[Action]:
+        actions = self.actions.by_team.get(team_number, [])
+        if action_type is None:
+            return list(actions)
+        return [a for a in actions if a.action_type == action_type]
+
+    def get_actions_by_player(
+        self,
+        team_number: int,
+        player_number: int,
+        action_type: Optional[ActionType] = None,
+    ) -> list[Action]:
+        actions = self.actions.by_player.get((team_number, player_number), [])
+        if action_type is None:
+            return list(actions)
+        return [a for a in actions if a.action_type == action_type]
+
+    def get_actions_by_type(self, action_type: ActionType) -> list[Action]:
+        return list(self.actions.by_type.get(action_type, []))
+
+    def get_actions_by_period(
+        self, period: int, period_type: PeriodType = PeriodType.REGULAR
+    ) -> list[Action]:
+        return list(self.actions.by_period.get((period_type, period), []))
+
+    def get_last_scoring_play(self, team_number: Optional[int] = None) -> Optional[Action]:
+        if team_number is None:
+            actions = self.actions
+        else:
+            actions = self.actions.by_team.get(team_number, [])
+        return next((a for a in reversed(actions) if a.is_scoring_play), None)
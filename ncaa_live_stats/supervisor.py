@@ -0,0 +1,219 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .client import DEFAULT_PORT, FeedClient
+from .main import NCAALiveStats
+
+
+@dataclass
+class GameReport:
+    key: str
+    host: str
+    port: int
+    match_number: Optional[int]
+    connected: bool
+    messages: int
+    cpu_seconds: float
+    memory_bytes: int
+
+
+def deep_sizeof(obj: object) -> int:
+    """Approximate the memory held by `obj` and everything it references.
+
+    Shared singletons (enum members, classes, modules) are not counted.
+
+    Args:
+        obj (object): Root object to measure
+
+    Returns:
+        int: Size in bytes
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, Enum)):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(vars(current))
+        for slot in getattr(type(current), "__slots__", ()):
+            if hasattr(current, slot):
+                stack.append(getattr(current, slot))
+    return total
+
+
+class GameSupervisor:
+    """Runs many `NCAALiveStats` feeds on a single event loop.
+
+    Games are registered by feed address and can be looked up either by
+    that key or by the match number announced in `matchInformation`.
+    Extra keyword arguments are passed to every `FeedClient`.
+
+    Measuring a game's memory walks its whole object graph on the event
+    loop, so each report re-measures only `memory_samples` games, in turn,
+    and reuses the last figure for the others.
+    """
+
+    def __init__(self, memory_samples: int = 1, **client_kwargs) -> None:
+        self.games: Dict[str, FeedClient] = {}
+        self.memory_samples = memory_samples
+        self._memory: Dict[str, int] = {}
+        self._memory_cursor = 0
+        self._client_kwargs = client_kwargs
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = False
+
+    def add_game(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        key: Optional[str] = None,
+        stats: Optional[NCAALiveStats] = None,
+    ) -> FeedClient:
+        """Register a feed. If the supervisor is running it is started immediately."""
+        key = key or f"{host}:{port}"
+        if key in self.games:
+            raise ValueError(f"Game {key} is already registered")
+        client = FeedClient(host, port, stats=stats, **self._client_kwargs)
+        self.games[key] = client
+        if self._running:
+            self._start(key)
+        return client
+
+    def remove_game(self, key: str) -> None:
+        client = self.games.pop(key)
+        client.stop()
+        self._memory.pop(key, None)
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def get(self, key: Union[str, int]) -> Optional[NCAALiveStats]:
+        """Get a game's parser by registry key or by match number."""
+        if isinstance(key, str):
+            client = self.games.get(key)
+            return client.stats if client else None
+        for client in self.games.values():
+            if client.stats.game.match_number == key:
+                return client.stats
+        return None
+
+    def _start(self, key: str) -> None:
+        self._tasks[key] = asyncio.create_task(self.games[key].run(), name=key)
+
+    async def run(self, report_interval: Optional[float] = None) -> None:
+        """Run every registered feed until `stop()` is called.
+
+        Args:
+            report_interval (float, optional): If set, log a resource report
+                for every game at this interval in seconds.
+        """
+        self._running = True
+        for key in self.games:
+            self._start(key)
+        try:
+            while self._running:
+                await asyncio.sleep(report_interval or 1.0)
+                if report_interval:
+                    self.log_report()
+        finally:
+            for client in self.games.values():
+                client.stop()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            self._tasks.clear()
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _sample_memory(self) -> None:
+        keys = list(self.games)
+        # New games are measured first, then every game in turn.
+        unmeasured = [key for key in keys if key not in self._memory]
+        for _ in range(min(self.memory_samples, len(keys))):
+            if unmeasured:
+                key = unmeasured.pop(0)
+            else:
+                key = keys[self._memory_cursor % len(keys)]
+                self._memory_cursor += 1
+            self._memory[key] = deep_sizeof(self.games[key].stats.game)
+
+    def report(self) -> List[GameReport]:
+        """Per-game message counts, CPU time spent parsing and memory held.
+
+        `memory_bytes` is 0 until a game has been measured.
+        """
+        self._sample_memory()
+        return [
+            GameReport(
+                key=key,
+                host=client.host,
+                port=client.port,
+                match_number=client.stats.game.match_number,
+                connected=client.connected,
+                messages=client.messages_received,
+                cpu_seconds=client.busy_time,
+                memory_bytes=self._memory.get(key, 0),
+            )
+            for key, client in self.games.items()
+        ]
+
+    def log_report(self) -> None:
+        for r in self.report():
+            logger.info(
+                f"[{os.getpid()}] {r.key} match={r.match_number} "
+                f"connected={r.connected} messages={r.messages} "
+                f"cpu={r.cpu_seconds:.3f}s memory={r.memory_bytes / 1024:.1f}KiB"
+            )
+
+
+def _run_shard(
+    feeds: List[Tuple[str, int]], report_interval: float, client_kwargs: dict
+) -> None:
+    supervisor = GameSupervisor(**client_kwargs)
+    for host, port in feeds:
+        supervisor.add_game(host, port)
+    asyncio.run(supervisor.run(report_interval=report_interval))
+
+
+def run_sharded(
+    feeds: Iterable[Tuple[str, int]],
+    processes: Optional[int] = None,
+    report_interval: float = 60.0,
+    **client_kwargs,
+) -> None:
+    """Spread feeds across worker processes, each running its own supervisor.
+
+    Args:
+        feeds (Iterable[Tuple[str, int]]): (host, port) pairs to consume
+        processes (int, optional): Number of workers. Defaults to the CPU count.
+        report_interval (float, optional): Seconds between per-game resource
+            reports logged by each worker. Defaults to 60.
+    """
+    feeds = list(feeds)
+    processes = min(processes or os.cpu_count() or 1, len(feeds))
+    shards = [feeds[i::processes] for i in range(processes)]
+    workers = [
+        multiprocessing.Process(
+            target=_run_shard, args=(shard, report_interval, client_kwargs)
+        )
+        for shard in shards
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Union
+
+from dateutil.parser import parse as dt_parse
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class FeedTime(float):
+    """Feed timestamp kept as seconds since 1970-01-01 in the feed's local time.
+
+    Compares and subtracts like a float; `datetime` converts on access.
+    """
+
+    __slots__ = ()
+
+    @property
+    def datetime(self) -> datetime:
+        return EPOCH + timedelta(seconds=float(self))
+
+    def __repr__(self) -> str:
+        return f"FeedTime({self.datetime.isoformat(sep=' ')})"
+
+
+def _fields(value: str):
+    """Split a `YYYY-MM-DD HH:MM:SS[:cc|.ffffff]` string, or None if it has another shape."""
+    n = len(value)
+    if n < 19 or value[4] != "-" or value[7] != "-" or value[10] != " " \
+            or value[13] != ":" or value[16] != ":":
+        return None
+    fraction = 0
+    if n > 19:
+        digits = value[20:]
+        if value[19] not in ":." or not digits.isdigit() or len(digits) > 6:
+            return None
+        # `:81` in pings is hundredths of a second.
+        fraction = int(digits) * 10 ** (6 - len(digits))
+    return (
+        int(value[0:4]),
+        int(value[5:7]),
+        int(value[8:10]),
+        int(value[11:13]),
+        int(value[14:16]),
+        int(value[17:19]),
+        fraction,
+    )
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a feed timestamp such as `2022-06-07 19:02:28:81` or `2022-06-07 19:02:16`.
+
+    Other shapes fall back to dateutil.
+
+    Args:
+        value (str): Timestamp from `timeActual`, `edited` or a ping
+
+    Returns:
+        datetime: Naive datetime in the feed's local time
+    """
+    try:
+        fields = _fields(value)
+        if fields is not None:
+            return datetime(*fields)
+    except ValueError:
+        pass
+    return dt_parse(value)
+
+
+@lru_cache(maxsize=64)
+def _date_seconds(date: str) -> int:
+    # A game's timestamps share a handful of dates, so this is nearly always cached.
+    return int((datetime(int(date[0:4]), int(date[5:7]), int(date[8:10])) - EPOCH).total_seconds())
+
+
+def parse_feed_time(value: str) -> FeedTime:
+    """Like `parse_timestamp`, but returns a `FeedTime` without building a datetime.
+
+    Args:
+        value (str): Timestamp from `timeActual`, `edited` or a ping
+
+    Returns:
+        FeedTime: Seconds since 1970-01-01 in the feed's local time
+    """
+    try:
+        fields = _fields(value)
+        if fields is not None and fields[3] < 24 and fields[4] < 60 and fields[5] < 60:
+            _, _, _, hour, minute, second, micro = fields
+            return FeedTime(
+                _date_seconds(value[:10]) + hour * 3600 + minute * 60 + second + micro / 1e6
+            )
+    except ValueError:
+        pass
+    return FeedTime((parse_timestamp(value).replace(tzinfo=None) - EPOCH).total_seconds())
+
+
+def as_datetime(value: Union[datetime, FeedTime, None]) -> datetime:
+    """Get a datetime from either timestamp representation."""
+    if isinstance(value, FeedTime):
+        return value.datetime
+    return value
@@ -0,0 +1,265 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from . import structs
+from .dispatch import _percentile
+from .main import NCAALiveStats
+from .timestamps import EPOCH, FeedTime
+
+if TYPE_CHECKING:
+    from .client import FeedClient
+
+SOURCES = ("ping", "action")
+
+
+@dataclass
+class WatchdogEvent:
+    """Something the watchdog noticed about the feed.
+
+    `kind` is "stale" (no message for `value` seconds), "lag" (a `source`
+    timestamp arrived `value` seconds late), "recovered" (messages are
+    flowing and on time again) or "reconnect" (a reconnect was requested).
+    """
+
+    kind: str
+    value: float
+    source: Optional[str] = None
+    at: float = 0.0
+
+
+def _feed_seconds(value) -> Optional[float]:
+    # Feed timestamps are naive local times; compare them as seconds since
+    # 1970-01-01 on the same local clock, like `FeedTime`.
+    if value is None:
+        return None
+    if isinstance(value, FeedTime):
+        return float(value)
+    if isinstance(value, datetime):
+        return (value.replace(tzinfo=None) - EPOCH).total_seconds()
+    return None
+
+
+def _local_now() -> float:
+    return (datetime.now() - EPOCH).total_seconds()
+
+
+class _LagWindow:
+    """Lag samples for one source over the last `window` seconds."""
+
+    def __init__(self, window: float, baseline_window: float) -> None:
+        self.window = window
+        self.baseline_window = baseline_window
+        self.samples: Deque[Tuple[float, float]] = deque()
+        # Raw (receipt - feed) offsets, monotonically increasing, so the
+        # front is the smallest offset seen in `baseline_window`.
+        self.offsets: Deque[Tuple[float, float]] = deque()
+
+    def add(self, at: float, offset: float, clock_offset: Optional[float]) -> float:
+        if clock_offset is None:
+            offsets = self.offsets
+            while offsets and offsets[-1][1] >= offset:
+                offsets.pop()
+            offsets.append((at, offset))
+            while offsets[0][0] < at - self.baseline_window:
+                offsets.popleft()
+            clock_offset = offsets[0][1]
+        lag = max(offset - clock_offset, 0.0)
+        self.samples.append((at, lag))
+        while self.samples[0][0] < at - self.window:
+            self.samples.popleft()
+        return lag
+
+    def summary(self) -> dict:
+        lags = [lag for _, lag in self.samples]
+        return {
+            "count": len(lags),
+            "p50": _percentile(lags, 0.5),
+            "p90": _percentile(lags, 0.9),
+            "p99": _percentile(lags, 0.99),
+            "max": max(lags, default=0.0),
+        }
+
+
+class FeedWatchdog:
+    """Watches a feed for silence and for late timestamps.
+
+    Lag is how long after its feed timestamp a message arrived: ping
+    `timestamp`s, and the `edited` (or `timeActual`) time of each live
+    action. Feed timestamps are the feed host's local time, so by default
+    the smallest offset seen in `baseline_window` is taken as the clock
+    difference and lag is measured above it. Pass `clock_offset` (e.g.
+    0.0 when both clocks are synced and in the same time zone) to measure
+    absolute lag instead.
+
+    Hand it to `FeedClient(watchdog=...)`, which reports every frame and
+    runs `check()` while connected. Events go to listeners added with
+    `add_listener`; a "stale" event (and a "lag" event if
+    `reconnect_on_lag`) asks the client to reconnect.
+    """
+
+    def __init__(
+        self,
+        stats: NCAALiveStats,
+        stale_after: float = 3.0,
+        max_lag: float = 2.0,
+        window: float = 60.0,
+        baseline_window: float = 600.0,
+        clock_offset: Optional[float] = None,
+        reconnect_on_lag: bool = False,
+    ) -> None:
+        """
+        Args:
+            stats (NCAALiveStats): Parser fed by the watched connection
+            stale_after (float, optional): Seconds without any message before
+                the feed is stale. Defaults to 3.0.
+            max_lag (float, optional): Lag in seconds that raises a "lag" event.
+                Defaults to 2.0.
+            window (float, optional): Seconds of lag samples kept for percentiles.
+                Defaults to 60.0.
+            baseline_window (float, optional): Seconds over which the clock
+                difference is estimated. Defaults to 600.0.
+            clock_offset (float, optional): Known receipt minus feed clock
+                difference in seconds. Estimated when omitted.
+            reconnect_on_lag (bool, optional): Also reconnect when lag exceeds
+                `max_lag`, not only when the feed goes stale.
+        """
+        self.stats = stats
+        self.stale_after = stale_after
+        self.max_lag = max_lag
+        self.clock_offset = clock_offset
+        self.reconnect_on_lag = reconnect_on_lag
+        self.client: Optional["FeedClient"] = None
+        self.events: Deque[WatchdogEvent] = deque(maxlen=100)
+        self.stale = False
+        self._lagging: Set[str] = set()
+        self._announced = False
+        self.last_message: Optional[float] = None
+        self._windows: Dict[str, _LagWindow] = {
+            source: _LagWindow(window, baseline_window) for source in SOURCES
+        }
+        self._listeners: List[Callable[[WatchdogEvent], None]] = []
+        self._last_ping = None
+        stats.add_change_listener(self._on_action, ("actions",), inline=True)
+        if stats.metrics is not None:
+            stats.metrics.gauge(
+                "feed_lag_p99_seconds",
+                lambda: {source: w.summary()["p99"] for source, w in self._windows.items()},
+                "Recent p99 feed lag, by timestamp source",
+                "source",
+            )
+            stats.metrics.gauge("feed_silence_seconds", self.silence, "Seconds since the last message")
+
+    def add_listener(self, func: Callable[[WatchdogEvent], None]) -> None:
+        """Call `func` with every `WatchdogEvent`."""
+        self._listeners.append(func)
+
+    def _emit(self, kind: str, value: float, source: Optional[str] = None) -> None:
+        event = WatchdogEvent(kind, value, source, time.time())
+        self.events.append(event)
+        for func in self._listeners:
+            try:
+                func(event)
+            except Exception:
+                logger.exception(f"Watchdog listener {func!r} failed")
+
+    @property
+    def lagging(self) -> bool:
+        """Whether any timestamp source is over `max_lag`."""
+        return bool(self._lagging)
+
+    def silence(self) -> float:
+        """Seconds since the last message, 0 before the first one."""
+        if self.last_message is None:
+            return 0.0
+        return time.monotonic() - self.last_message
+
+    def observe(self, message_type: str, received: Optional[float] = None) -> None:
+        """Record that a message was received and handled.
+
+        Args:
+            message_type (str): Feed type of the message
+            received (float, optional): Local receipt time as seconds since
+                1970-01-01. Defaults to now.
+        """
+        self.last_message = time.monotonic()
+        if self.stale:
+            self.stale = self._announced = False
+            self._emit("recovered", 0.0)
+        if message_type == "ping":
+            ping = self.stats.last_ping
+            if ping is not None and ping != self._last_ping:
+                self._last_ping = ping
+                self._sample("ping", _feed_seconds(ping), received)
+
+    def _on_action(self, changes: List[structs.Change], game: structs.Game) -> None:
+        # Only live actions: the playbyplay burst replaces the whole store
+        # without a change set.
+        received = _local_now()
+        for change in changes:
+            action = change.new
+            self._sample("action", _feed_seconds(action.edited or action.time_actual), received)
+
+    def _sample(self, source: str, feed_time: Optional[float], received: Optional[float]) -> None:
+        if feed_time is None:
+            return
+        received = received if received is not None else _local_now()
+        lag = self._windows[source].add(time.monotonic(), received - feed_time, self.clock_offset)
+        if lag > self.max_lag:
+            if source not in self._lagging:
+                self._lagging.add(source)
+                logger.warning(f"Feed {source} lag {lag:.2f}s exceeds {self.max_lag:.2f}s")
+                self._emit("lag", lag, source)
+                if self.reconnect_on_lag:
+                    self._reconnect()
+        elif source in self._lagging:
+            self._lagging.discard(source)
+            self._emit("recovered", lag, source)
+
+    def check(self) -> bool:
+        """Raise a "stale" event if no message arrived for `stale_after` seconds.
+
+        Returns:
+            bool: Whether the feed is stale
+        """
+        silence = self.silence()
+        if silence > self.stale_after and not self._announced:
+            self.stale = self._announced = True
+            logger.warning(f"Feed stale: no message for {silence:.1f}s")
+            self._emit("stale", silence)
+            self._reconnect()
+        return self.stale
+
+    def _reconnect(self) -> None:
+        client = self.client
+        if client is not None and client.connected:
+            self._emit("reconnect", self.silence())
+            client.reconnect()
+
+    def reset(self) -> None:
+        """Start timing from now, e.g. on a new connection. The feed stays
+        stale until a message arrives, but a silent new connection is
+        reported (and reconnected) again."""
+        self.last_message = time.monotonic()
+        self._announced = False
+
+    async def run(self, interval: float = 0.5) -> None:
+        """Call `check()` every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            if self.client is None or self.client.connected:
+                self.check()
+
+    def summary(self) -> dict:
+        """Lag percentiles (seconds) per timestamp source and the current state."""
+        return {
+            "stale": self.stale,
+            "lagging": self.lagging,
+            "silence": self.silence(),
+            "lag": {source: window.summary() for source, window in self._windows.items()},
+        }
@@ -15,8 +15,8 @@ setup(
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
     ],
     author="Gurleen Singh",
     author_email="gs585@drexel.edu",
@@ -24,5 +24,6 @@ setup(
     download_url="https://github.com/gurleen/herhoopstats/archive/refs/heads/main.zip",
     keywords=["sports", "basketball", "stats"],
     install_requires=["aiohttp", "loguru", "pyserial", "pyserial-asyncio", "tinydb", "uvicorn"],
-    python_requires=">=3",
+    extras_require={"columnar": ["numpy"], "fast": ["orjson", "msgspec"]},
+    python_requires=">=3.10",
 )
\ No newline at end of file